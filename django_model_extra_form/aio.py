@@ -0,0 +1,106 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+"""
+asyncio counterparts of extra data APIs, python 3.6+ only
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django_model_extra_form.models import hydrate_extra_targets, \
+    export_extra_data, chunked, prefetch_extra_storage
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # django < 3.0
+    sync_to_async = None
+
+# all database calls run in one thread, connections are thread local
+_database_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def database_sync_to_async(func):
+    """
+    wrap synchronous function touching database to be awaitable
+    """
+    if sync_to_async is not None:
+        return sync_to_async(func, thread_sensitive=True)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_in_executor(_database_executor, func, *args, **kwargs)
+
+    return wrapper
+
+
+async def run_in_executor(executor, func, *args, **kwargs):
+    """
+    run CPU heavy function in executor or directly when executor is None
+    """
+    if executor is None:
+        return func(*args, **kwargs)
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def _iterator(instances, chunk_size):
+    if hasattr(instances, 'iterator'):
+        # queryset, don't cache instances
+        instances = instances.iterator(chunk_size=chunk_size)
+
+    return chunked(instances, chunk_size)
+
+
+def _fetch(instances):
+    """
+    evaluate instances and load data stored apart from model rows,
+    runs in database thread
+    """
+    instances = list(instances)
+    prefetch_extra_storage(instances)
+    return instances
+
+
+def _next_chunk(chunks):
+    chunk = next(chunks, None)
+    if chunk is not None:
+        prefetch_extra_storage(chunk)
+
+    return chunk
+
+
+def _export_chunk(chunk, field_names):
+    return list(export_extra_data(chunk, field_names))
+
+
+async def ahydrate_extra_targets(instances, executor=None):
+    """
+    fetch instances in database thread and parse their extra targets
+    in executor
+    """
+    instances = await database_sync_to_async(_fetch)(instances)
+    return await run_in_executor(executor, hydrate_extra_targets, instances)
+
+
+async def aexport_extra_data(instances, field_names=None, chunk_size=2000,
+                             executor=None):
+    """
+    asynchronous generator of primary key and extra data of every instance
+    """
+    chunks = await database_sync_to_async(_iterator)(instances, chunk_size)
+    next_chunk = database_sync_to_async(_next_chunk)
+    while True:
+        chunk = await next_chunk(chunks)
+        if chunk is None:
+            break
+
+        rows = await run_in_executor(
+            executor, _export_chunk, chunk, field_names
+        )
+        for data in rows:
+            yield data
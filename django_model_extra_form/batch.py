@@ -0,0 +1,78 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
+
+import multiprocessing
+from collections import deque
+
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.utils.six import text_type
+
+from django_model_extra_form.forms.utils import FormValidationError
+from django_model_extra_form.models import chunked
+
+
+def deserialize_chunk(target, values, validate=True):
+    """
+    deserialize chunk of raw target values, runs in worker process
+    :return: list of (errors, cleaned data) tuples, errors is None for
+        valid value, decoding errors are non field errors
+    """
+    results = []
+    for value in values:
+        try:
+            results.append((None, target.deserialize(value, validate)))
+        except FormValidationError as e:
+            # plain dict can be pickled back to parent process
+            results.append((e.message_dict, None))
+        except (ValueError, TypeError) as e:
+            # undecodable value, e.g. broken JSON
+            results.append(({NON_FIELD_ERRORS: [text_type(e)]}, None))
+
+    return results
+
+
+def deserialize_batch(target, values, validate=True, processes=None,
+                      chunk_size=1000, pool=None, max_pending=None):
+    """
+    deserialize raw target values in parallel using process pool
+    :param target: ExtraTarget instance, has to be picklable
+    :param values: iterable of raw target values (database column values)
+    :param processes: number of worker processes, cpu count by default
+    :param chunk_size: number of values sent to worker at once
+    :param pool: existing multiprocessing pool, new one is created when None
+    :param max_pending: maximum number of chunks in progress, it bounds
+        memory as values are consumed lazily, 2 chunks per worker by default
+    :return: generator of cleaned data or FormValidationError in values order
+    """
+    own_pool = pool is None
+    if own_pool:
+        processes = processes or multiprocessing.cpu_count()
+        pool = multiprocessing.Pool(processes)
+
+    max_pending = max_pending or 2 * (processes or pool._processes)
+    pending = deque()
+    try:
+        for chunk in chunked(values, chunk_size):
+            pending.append(
+                pool.apply_async(deserialize_chunk, (target, chunk, validate))
+            )
+            if len(pending) >= max_pending:
+                for result in _chunk_results(pending.popleft()):
+                    yield result
+
+        while pending:
+            for result in _chunk_results(pending.popleft()):
+                yield result
+
+    finally:
+        if own_pool:
+            pool.terminate()
+            pool.join()
+
+
+def _chunk_results(async_result):
+    for errors, cleaned in async_result.get():
+        yield cleaned if errors is None else FormValidationError(errors)
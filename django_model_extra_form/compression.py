@@ -0,0 +1,231 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+"""
+Compressing wrapper of ExtraTargetSerializer, zlib or zstd (optional
+zstandard package) with optional dictionary trained from stored data,
+compressed data are bytes starting with zero byte, target column has
+to be BinaryField (e.g. postgres text rejects zero bytes)
+"""
+
+from __future__ import unicode_literals, absolute_import
+
+import re
+import struct
+import zlib
+from collections import Counter
+
+from django.utils.six import text_type, binary_type
+
+from django_model_extra_form.models import ExtraTargetSerializer, JSON, RAW
+
+# compressed data start with zero byte which is never first byte of JSON
+MAGIC = b'\x00'
+ZLIB = 'zlib'
+ZSTD = 'zstd'
+ALGORITHMS = {ZLIB: b'z', ZSTD: b's'}
+# magic, algorithm, dictionary id
+HEADER = struct.Struct(str('>ccI'))
+
+
+def dictionary_id(dictionary):
+    return zlib.crc32(dictionary) & 0xffffffff if dictionary else 0
+
+
+def compress(algorithm, data, level=None, dictionary=None):
+    if algorithm == ZSTD:
+        import zstandard
+        kwargs = {'level': level or 3}
+        if dictionary:
+            kwargs['dict_data'] = zstandard.ZstdCompressionDict(dictionary)
+
+        return zstandard.ZstdCompressor(**kwargs).compress(data)
+
+    level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+    if dictionary:
+        compressor = zlib.compressobj(
+            level, zlib.DEFLATED, zlib.MAX_WBITS, 9, zlib.Z_DEFAULT_STRATEGY,
+            dictionary
+        )
+    else:
+        compressor = zlib.compressobj(level)
+
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(algorithm, data, dictionary=None):
+    if algorithm == ZSTD:
+        import zstandard
+        kwargs = {}
+        if dictionary:
+            kwargs['dict_data'] = zstandard.ZstdCompressionDict(dictionary)
+
+        return zstandard.ZstdDecompressor(**kwargs).decompress(data)
+
+    if dictionary:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS, dictionary)
+    else:
+        decompressor = zlib.decompressobj()
+
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+class CompressedSerializer(ExtraTargetSerializer):
+    """
+    compress output of wrapped serializer, data not starting with header
+    (e.g. stored before compression) are passed to wrapped serializer as
+    they are, use compressed_serializer() to configure it
+    """
+    serializer = JSON
+    algorithm = ZLIB
+    level = None
+    # bytes or path of file with dictionary used for compression
+    dictionary = None
+    # dictionaries used by already stored data
+    old_dictionaries = ()
+    # wrapped serializer works with text, None for bytes
+    encoding = 'utf-8'
+
+    @classmethod
+    def load_dictionary(cls, dictionary):
+        if isinstance(dictionary, text_type):
+            with open(dictionary, 'rb') as fp:
+                return fp.read()
+
+        return dictionary
+
+    @classmethod
+    def dictionaries(cls):
+        """
+        :return: current dictionary and {dictionary id: dictionary}
+        """
+        if '_dictionaries' not in cls.__dict__:
+            current = cls.load_dictionary(cls.dictionary)
+            all_dictionaries = [current] + [
+                cls.load_dictionary(d) for d in cls.old_dictionaries
+            ]
+            cls._dictionaries = current, dict(
+                (dictionary_id(d), d) for d in all_dictionaries if d
+            )
+
+        return cls._dictionaries
+
+    @classmethod
+    def is_compressed(cls, data):
+        return isinstance(data, (binary_type, bytearray, memoryview)) and \
+            bytes(data[:1]) == MAGIC
+
+    @classmethod
+    def decompress(cls, data):
+        """
+        :return: uncompressed bytes of wrapped serializer
+        """
+        data = bytes(data)
+        if not cls.is_compressed(data):
+            return data
+
+        _, code, dict_id = HEADER.unpack_from(data)
+        dictionary = None
+        if dict_id:
+            try:
+                dictionary = cls.dictionaries()[1][dict_id]
+            except KeyError:
+                raise ValueError('Unknown compression dictionary {}'.format(
+                    dict_id
+                ))
+
+        algorithm = next(
+            (a for a, c in ALGORITHMS.items() if c == code), None
+        )
+        if algorithm is None:
+            raise ValueError('Unknown compression algorithm {!r}'.format(code))
+
+        return decompress(algorithm, data[HEADER.size:], dictionary)
+
+    @classmethod
+    def compress(cls, data):
+        if isinstance(data, text_type):
+            data = data.encode(cls.encoding or 'utf-8')
+
+        if not isinstance(data, (binary_type, bytearray, memoryview)):
+            raise TypeError(
+                '{} has to produce text or bytes to be compressed, not '
+                '{}'.format(cls.serializer.__name__, type(data).__name__)
+            )
+
+        dictionary = cls.dictionaries()[0]
+        header = HEADER.pack(
+            MAGIC, ALGORITHMS[cls.algorithm], dictionary_id(dictionary)
+        )
+        return header + compress(cls.algorithm, data, cls.level, dictionary)
+
+    @classmethod
+    def loads(cls, data):
+        if isinstance(data, (binary_type, bytearray, memoryview)):
+            data = cls.decompress(data)
+            if cls.encoding:
+                data = data.decode(cls.encoding)
+
+        return cls.serializer.loads(data)
+
+    @classmethod
+    def dumps(cls, data):
+        return cls.compress(cls.serializer.dumps(data))
+
+
+def compressed_serializer(serializer=JSON, algorithm=ZLIB, level=None,
+                          dictionary=None, old_dictionaries=(),
+                          encoding='utf-8'):
+    """
+    build CompressedSerializer class for ExtraTarget serializer option,
+    e.g. ExtraTarget('extra', Form, serializer=compressed_serializer(JSON)),
+    wrapped serializer has to produce text or bytes, RAW data (e.g. of
+    JSONField) can't be compressed
+    """
+    assert algorithm in ALGORITHMS
+    if issubclass(serializer, RAW):
+        raise ValueError(
+            'RAW data are not text or bytes, compress JSON serializer and '
+            'store it in BinaryField instead'
+        )
+    return type(str('Compressed{}'.format(serializer.__name__)), (
+        CompressedSerializer,
+    ), {
+        'serializer': serializer,
+        'algorithm': algorithm,
+        'level': level,
+        'dictionary': dictionary,
+        'old_dictionaries': tuple(old_dictionaries),
+        'encoding': encoding,
+    })
+
+
+JSON_TOKEN = re.compile(
+    br'"(?:[^"\\]|\\.)*"\s*:?|-?\d+(?:\.\d+)?|true|false|null'
+)
+
+
+def train_dictionary(samples, size=16384, algorithm=ZLIB):
+    """
+    train compression dictionary from samples of uncompressed data
+    :param samples: list of bytes
+    """
+    if algorithm == ZSTD:
+        import zstandard
+        return zstandard.train_dictionary(size, samples).as_bytes()
+
+    # zlib uses preset dictionary as history, most frequent JSON tokens
+    # (keys and values) are placed at its end to be referenced cheaply
+    counter = Counter(
+        token for sample in samples for token in JSON_TOKEN.findall(sample)
+    )
+    tokens = []
+    length = 0
+    for token, count in counter.most_common():
+        if count < 2 or length + len(token) > size:
+            break
+
+        tokens.append(token)
+        length += len(token)
+
+    return b''.join(reversed(tokens))
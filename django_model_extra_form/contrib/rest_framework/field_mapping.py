@@ -4,6 +4,14 @@
 
 from __future__ import unicode_literals, absolute_import
 
+import threading
+from weakref import WeakKeyDictionary
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # python 2
+    from collections import Mapping
+
 from django import forms
 from django.utils.six import PY34
 from rest_framework import serializers
@@ -16,47 +24,142 @@ else:
     from singledispatch import singledispatch
 
 
+# (form field class, mapping function) registered on first mapping
+_default_mappings = []
+_registration_lock = threading.Lock()
+# form field instance: mapping result
+_mapping_cache = WeakKeyDictionary()
+
+
 @singledispatch
-def map_form_to_serializer(form_field):
+def dispatch_form_field(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(form_field_kwargs(form_field))
     return FormField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.BooleanField)
+def register_default_mappings():
+    """
+    register collected default mappings, mappings are removed after all
+    of them are registered so concurrent callers wait for the lock
+    """
+    with _registration_lock:
+        for form_field_class, func in _default_mappings:
+            if form_field_class not in dispatch_form_field.registry:
+                dispatch_form_field.register(form_field_class, func)
+
+        del _default_mappings[:]
+
+
+def map_form_to_serializer(form_field):
+    """
+    map django form field into rest framework serializer field
+    :return: serializer field class and its kwargs
+    """
+    if _default_mappings:
+        register_default_mappings()
+
+    try:
+        field_class, field_kwargs = _mapping_cache[form_field]
+    except (KeyError, TypeError):
+        field_class, field_kwargs = dispatch_form_field(form_field)
+        try:
+            _mapping_cache[form_field] = field_class, field_kwargs
+        except TypeError:  # can't be weak referenced
+            pass
+
+    # callers are free to modify kwargs
+    return field_class, dict(field_kwargs)
+
+
+def register(form_field_class, func=None):
+    """
+    register custom mapping, same as singledispatch register
+    """
+    _mapping_cache.clear()
+    return dispatch_form_field.register(form_field_class, func)
+
+
+def default_mapping(form_field_class):
+    def decorator(func):
+        _default_mappings.append((form_field_class, func))
+        return func
+
+    return decorator
+
+
+def dispatch(form_field_class):
+    """
+    mapping function of form field class, same as singledispatch dispatch
+    """
+    if _default_mappings:
+        register_default_mappings()
+
+    return dispatch_form_field.dispatch(form_field_class)
+
+
+class Registry(Mapping):
+    """
+    read only view of registered mappings including default ones
+    """
+
+    @property
+    def registry(self):
+        if _default_mappings:
+            register_default_mappings()
+
+        return dispatch_form_field.registry
+
+    def __getitem__(self, key):
+        return self.registry[key]
+
+    def __iter__(self):
+        return iter(self.registry)
+
+    def __len__(self):
+        return len(self.registry)
+
+
+# singledispatch API of map_form_to_serializer
+map_form_to_serializer.register = register
+map_form_to_serializer.dispatch = dispatch
+map_form_to_serializer.registry = Registry()
+
+
+@default_mapping(forms.BooleanField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.pop('allow_null', None)  # not valid for BooleanField
     return serializers.BooleanField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.CharField)
+@default_mapping(forms.CharField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(char_field_kwargs(form_field))
     return serializers.CharField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.ChoiceField)
+@default_mapping(forms.ChoiceField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(choice_field_kwargs(form_field))
     return serializers.ChoiceField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.DateField)
+@default_mapping(forms.DateField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     return serializers.DateField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.DateTimeField)
+@default_mapping(forms.DateTimeField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     return serializers.DateTimeField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.DecimalField)
+@default_mapping(forms.DecimalField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(integer_field_kwargs(form_field))
@@ -64,21 +167,21 @@ def form_to_serializer(form_field):
     return serializers.DecimalField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.EmailField)
+@default_mapping(forms.EmailField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(char_field_kwargs(form_field))
     return serializers.EmailField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.FileField)
+@default_mapping(forms.FileField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(file_field_kwargs(form_field))
     return serializers.FileField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.FilePathField)
+@default_mapping(forms.FilePathField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(choice_field_kwargs(form_field))
@@ -86,28 +189,28 @@ def form_to_serializer(form_field):
     return serializers.FilePathField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.FloatField)
+@default_mapping(forms.FloatField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(integer_field_kwargs(form_field))
     return serializers.FloatField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.ImageField)
+@default_mapping(forms.ImageField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(file_field_kwargs(form_field))
     return serializers.ImageField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.IntegerField)
+@default_mapping(forms.IntegerField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(integer_field_kwargs(form_field))
     return serializers.IntegerField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.GenericIPAddressField)
+@default_mapping(forms.GenericIPAddressField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(char_field_kwargs(form_field))
@@ -115,33 +218,33 @@ def form_to_serializer(form_field):
     return serializers.IPAddressField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.NullBooleanField)
+@default_mapping(forms.NullBooleanField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     return serializers.NullBooleanField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.SlugField)
+@default_mapping(forms.SlugField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(char_field_kwargs(form_field))
     return serializers.SlugField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.TimeField)
+@default_mapping(forms.TimeField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     return serializers.TimeField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.URLField)
+@default_mapping(forms.URLField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     field_kwargs.update(char_field_kwargs(form_field))
     return serializers.URLField, field_kwargs
 
 
-@map_form_to_serializer.register(forms.UUIDField)
+@default_mapping(forms.UUIDField)
 def form_to_serializer(form_field):
     field_kwargs = field_common_kwargs(form_field)
     return serializers.UUIDField, field_kwargs
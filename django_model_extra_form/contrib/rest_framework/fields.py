@@ -4,9 +4,16 @@
 
 from __future__ import unicode_literals, absolute_import
 
-from json_encoder import json
+import logging
+
+from django.conf import settings
+from django.utils.six import text_type
 from rest_framework import serializers
 
+from django_model_extra_form.models import JSON, json_module
+
+logger = logging.getLogger(__name__)
+
 
 class FormField(serializers.Field):
     """ default Rest framework field mapped to existing django form field """
@@ -16,7 +23,80 @@ class FormField(serializers.Field):
         super(FormField, self).__init__(*args, **kwargs)
 
     def to_representation(self, value):
-        return json.dumps(value)
+        return json_module().dumps(value)
 
     def to_internal_value(self, data):
         return self.form_field.to_python(data)
+
+
+class RawJSON(text_type):
+    """ already encoded JSON, renderers embed it without encoding """
+
+
+class RawExtraTargetField(serializers.Field):
+    """
+    read only field of whole extra target, stored JSON is passed through
+    as RawJSON when it doesn't need any transformation and data are
+    rendered by renderers.ExtraJSONRenderer (or its subclass), it's
+    enabled by 'raw_json' serializer context flag (see
+    views.stream_representation) or by accepted renderer of request
+    in context, data are decoded otherwise
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs['read_only'] = True
+        super(RawExtraTargetField, self).__init__(*args, **kwargs)
+
+    @property
+    def target(self):
+        model_class = self.parent.Meta.model
+        return next(
+            t for t in model_class.get_extra_targets() if t.name == self.source
+        )
+
+    def renders_raw_json(self):
+        from django_model_extra_form.contrib.rest_framework.renderers import \
+            ExtraJSONRenderer
+
+        if self.context.get('raw_json'):
+            return True
+
+        renderer = getattr(
+            self.context.get('request'), 'accepted_renderer', None
+        )
+        return isinstance(renderer, ExtraJSONRenderer)
+
+    def to_representation(self, value):
+        target = self.target
+        if is_passthrough(target) and self.renders_raw_json():
+            value = RawJSON(value or '{}')
+            if settings.DEBUG:
+                check_passthrough(target, value)
+
+            return value
+
+        return target.deserialize(
+            value, validate=False, trusted=target.trusted
+        )
+
+
+def is_passthrough(target):
+    """
+    stored data can be used as they are, they are JSON and not upgraded
+    """
+    return issubclass(target.serializer, JSON) and target.version is None
+
+
+def check_passthrough(target, value):
+    """
+    log stored data which differ from data cleaned by target forms
+    """
+    json = json_module()
+    cleaned = target.serialize(
+        target.deserialize(value, validate=False), validate=False
+    )
+    if json.loads(cleaned) != json.loads(value):
+        logger.warning(
+            'Stored data of %r target differ from cleaned data: %s != %s',
+            target.name, value, cleaned
+        )
@@ -0,0 +1,161 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
+
+import re
+import uuid
+from collections import OrderedDict
+
+from django.utils.six import iteritems, text_type
+from json_encoder import json
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from django_model_extra_form.contrib.rest_framework.fields import RawJSON
+
+
+# types of values which are or may contain RawJSON values
+RAW_JSON_TYPES = (RawJSON, dict, list, tuple)
+
+
+def replace_raw_json(data, placeholder, raw):
+    """
+    replace RawJSON values by placeholder strings, containers without
+    RawJSON values aren't copied
+    :param placeholder: format of placeholder with index of raw value
+    :param raw: list collecting replaced RawJSON values
+    """
+    if isinstance(data, RawJSON):
+        raw.append(data)
+        return placeholder.format(len(raw) - 1)
+
+    if isinstance(data, dict):
+        replaced = None
+        for key, value in iteritems(data):
+            if isinstance(value, RAW_JSON_TYPES):
+                new_value = replace_raw_json(value, placeholder, raw)
+                if new_value is not value:
+                    replaced = replaced or OrderedDict(data)
+                    replaced[key] = new_value
+
+        return data if replaced is None else replaced
+
+    if isinstance(data, (list, tuple)):
+        replaced = None
+        for index, value in enumerate(data):
+            if isinstance(value, RAW_JSON_TYPES):
+                new_value = replace_raw_json(value, placeholder, raw)
+                if new_value is not value:
+                    replaced = replaced or list(data)
+                    replaced[index] = new_value
+
+        return data if replaced is None else replaced
+
+    return data
+
+
+def encode_json(data, encoder):
+    """
+    encode data with encoder, RawJSON values are embedded as they are,
+    data are encoded at once and placeholders of RawJSON values are
+    substituted in encoded output
+    """
+    prefix = 'raw-json-{}-'.format(uuid.uuid4().hex)
+    raw = []
+    data = replace_raw_json(data, prefix + '{}', raw)
+    encoded = encoder.encode(data)
+    if not raw:
+        return encoded
+
+    return re.sub(
+        '"{}([0-9]+)"'.format(prefix),
+        lambda match: text_type(raw[int(match.group(1))]),
+        encoded
+    )
+
+
+def load_raw_json(data):
+    """
+    replace RawJSON values by decoded data
+    """
+    if isinstance(data, RawJSON):
+        return json.loads(data)
+
+    if isinstance(data, dict):
+        return OrderedDict((k, load_raw_json(v)) for k, v in iteritems(data))
+
+    if isinstance(data, (list, tuple)):
+        return [load_raw_json(v) for v in data]
+
+    return data
+
+
+class ExtraJSONRenderer(JSONRenderer):
+    """
+    JSON renderer embedding RawJSON values without encoding them again,
+    indented output decodes them first
+    """
+    encoder_class = JSONEncoder
+
+    def get_encoder(self):
+        return self.encoder_class(
+            ensure_ascii=self.ensure_ascii, allow_nan=not self.strict,
+            separators=(',', ':'),
+        )
+
+    def encode_row(self, row, encoder):
+        data = encode_json(row, encoder)
+        # keep output strict javascript subset as JSONRenderer does
+        return data.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None:
+            return super(ExtraJSONRenderer, self).render(
+                load_raw_json(data), accepted_media_type, renderer_context
+            )
+
+        return self.encode_row(data, self.get_encoder()).encode()
+
+
+class StreamingJSONRenderer(ExtraJSONRenderer):
+    """
+    render iterable of rows as JSON array, row by row
+    """
+
+    def render_stream(self, rows):
+        """
+        :return: generator of bytes
+        """
+        encoder = self.get_encoder()
+        separator = '['
+        for row in rows:
+            yield (separator + self.encode_row(row, encoder)).encode()
+            separator = ','
+
+        yield b'[]' if separator == '[' else b']'
+
+
+class StreamingNDJSONRenderer(StreamingJSONRenderer):
+    """
+    render iterable of rows as newline delimited JSON
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        rows = data if isinstance(data, (list, tuple)) else [data]
+        return b''.join(self.render_stream(rows))
+
+    def render_stream(self, rows):
+        encoder = self.get_encoder()
+        for row in rows:
+            yield (self.encode_row(row, encoder) + '\n').encode()
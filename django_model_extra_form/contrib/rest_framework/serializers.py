@@ -6,12 +6,39 @@ from __future__ import unicode_literals, absolute_import
 
 from collections import OrderedDict
 
+from django.db import models
+from rest_framework.serializers import ModelSerializer, ListSerializer, \
+    LIST_SERIALIZER_KWARGS
+
 from django_model_extra_form.contrib.rest_framework.field_mapping import \
     map_form_to_serializer
+from django_model_extra_form.models import hydrate_extra_targets
 
 
 class ExtraFormSerializerMixin(object):
 
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        """
+        ExtraFormListSerializer is used with many=True unless
+        Meta.list_serializer_class is set
+        """
+        allow_empty = kwargs.pop('allow_empty', None)
+        child_serializer = cls(*args, **kwargs)
+        list_kwargs = {'child': child_serializer}
+        if allow_empty is not None:
+            list_kwargs['allow_empty'] = allow_empty
+
+        list_kwargs.update(dict(
+            (key, value) for key, value in kwargs.items()
+            if key in LIST_SERIALIZER_KWARGS
+        ))
+        list_serializer_class = getattr(
+            getattr(cls, 'Meta', None), 'list_serializer_class',
+            ExtraFormListSerializer
+        )
+        return list_serializer_class(*args, **list_kwargs)
+
     def build_property_field(self, field_name, model_class):
         """
         some model properties can be extra data fields
@@ -43,13 +70,85 @@ class ExtraFormSerializerMixin(object):
         return field_class, field_kwargs
 
 
+class ExtraFormListSerializer(ListSerializer):
+    """
+    hydrate extra targets of all instances at once before rendering,
+    default list serializer of ExtraFormSerializerMixin
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return [
+            self.child.to_representation(item)
+            for item in hydrate_extra_targets(iterable)
+        ]
+
+
+class CompiledExtraFormSerializerMixin(ExtraFormSerializerMixin):
+    """
+    serializer with declared extra fields built by
+    extra_form_serializer_class()
+    """
+    extra_field_names = frozenset()
+
+    def to_representation(self, instance):
+        """
+        hydrate extra targets at once unless they are hydrated already
+        (e.g. by ExtraFormListSerializer), extra values are read directly
+        from instance attributes then
+        """
+        values = instance.__dict__
+        if any(name not in values for name in self.extra_field_names):
+            hydrate_extra_targets([instance])
+
+        return super(CompiledExtraFormSerializerMixin, self).to_representation(
+            instance
+        )
+
+
+_serializer_classes = {}
+
+
+def extra_form_serializer_class(model_class, fields=None, base_class=None):
+    """
+    build serializer class with extra fields declared, classes are cached
+    :param fields: serializer fields, all extra fields by default
+    :param base_class: serializer base class, ModelSerializer by default
+    """
+    base_class = base_class or ModelSerializer
+    fields = tuple(fields or extra_form_fields_names(model_class))
+    key = (model_class, fields, base_class)
+    if key not in _serializer_classes:
+        form_fields = extra_form_fields(model_class)
+        attrs = OrderedDict()
+        for name in fields:
+            if name in form_fields:
+                field_class, field_kwargs = map_form_to_serializer(
+                    form_fields[name]
+                )
+                attrs[name] = field_class(**field_kwargs)
+
+        attrs['extra_field_names'] = frozenset(attrs)
+        attrs['Meta'] = type(str('Meta'), (object, ), {
+            'model': model_class,
+            'fields': fields,
+        })
+        _serializer_classes[key] = type(
+            str('{}ExtraFormSerializer'.format(model_class.__name__)),
+            (CompiledExtraFormSerializerMixin, base_class),
+            attrs
+        )
+
+    return _serializer_classes[key]
+
+
 def extra_form_fields_names(model_class):
-    return [n for t in model_class().extra_targets for n in t.field_names]
+    return [n for t in model_class.get_extra_targets() for n in t.field_names]
 
 
 def extra_form_fields(model_class):
     fields = OrderedDict()
-    for target in model_class().extra_targets:
+    for target in model_class.get_extra_targets():
         fields.update(target.fields)
 
     return fields
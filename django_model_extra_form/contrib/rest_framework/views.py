@@ -0,0 +1,50 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
+
+from django.http import StreamingHttpResponse
+
+from django_model_extra_form.models import hydrate_extra_targets, chunked
+
+
+def stream_representation(instances, serializer, chunk_size=500):
+    """
+    generate serialized instances, chunks of instances are hydrated at once,
+    stored JSON is passed through as RawJSON (see RawExtraTargetField)
+    so rows have to be rendered by renderers.ExtraJSONRenderer subclass
+    :param instances: queryset (not cached) or iterable of instances
+    :param serializer: serializer or list serializer instance
+    """
+    serializer.context['raw_json'] = True
+    child = getattr(serializer, 'child', serializer)
+    if hasattr(instances, 'iterator'):
+        instances = instances.iterator(chunk_size=chunk_size)
+
+    for chunk in chunked(instances, chunk_size):
+        for instance in hydrate_extra_targets(chunk):
+            yield child.to_representation(instance)
+
+
+class StreamingListMixin(object):
+    """
+    list view mixin streaming response when accepted renderer supports it
+    (see renderers.StreamingJSONRenderer), pagination isn't applied
+    """
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not hasattr(renderer, 'render_stream'):
+            return super(StreamingListMixin, self).list(
+                request, *args, **kwargs
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = stream_representation(
+            queryset, self.get_serializer(many=True), self.stream_chunk_size
+        )
+        return StreamingHttpResponse(
+            renderer.render_stream(rows), content_type=renderer.media_type
+        )
@@ -0,0 +1,174 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+"""
+Database expressions over extra fields stored in JSON target columns,
+they are supported by PostgreSQL only
+"""
+
+from __future__ import unicode_literals, absolute_import
+
+from django import forms
+from django.db import NotSupportedError, models
+from django.db.models import ExpressionWrapper, Value
+from django.db.models.expressions import Combinable
+from django.db.models.functions import Cast, NullIf
+from django.utils.six import PY34
+
+if PY34:
+    from functools import singledispatch
+else:
+    from singledispatch import singledispatch
+
+
+def check_postgresql(connection):
+    """
+    JSON key transforms are compiled to PostgreSQL jsonb operators only
+    """
+    if connection.vendor != 'postgresql':
+        raise NotSupportedError(
+            'Extra field expressions require PostgreSQL database, '
+            '{!r} backend is used'.format(connection.vendor)
+        )
+
+
+def json_field_class():
+    try:
+        from django.contrib.postgres.fields import JSONField
+    except ImportError as e:  # psycopg2 isn't installed
+        raise NotSupportedError(
+            'Extra field expressions require PostgreSQL database: {}'.format(e)
+        )
+
+    return JSONField
+
+
+def key_text_transform_class():
+    try:
+        from django.contrib.postgres.fields.jsonb import KeyTextTransform
+    except ImportError as e:
+        raise NotSupportedError(
+            'Extra field expressions require PostgreSQL database: {}'.format(e)
+        )
+
+    return KeyTextTransform
+
+
+class PostgreSQLExpression(ExpressionWrapper):
+    """
+    expression compiled on PostgreSQL only, NotSupportedError is raised
+    instead of compiling it into invalid SQL of other backends
+    """
+
+    def __init__(self, expression):
+        super(PostgreSQLExpression, self).__init__(
+            expression, output_field=expression.output_field
+        )
+
+    def as_sql(self, compiler, connection):
+        check_postgresql(connection)
+        return compiler.compile(self.expression)
+
+
+def target_column(model, target):
+    """
+    target column as JSON expression, text columns
+    (JSON serializer) are cast to JSON, empty text is NULL
+    """
+    field = model._meta.get_field(target.name)
+    if field.get_internal_type() == 'JSONField':
+        return target.name
+
+    return Cast(NullIf(target.name, Value('')), json_field_class()())
+
+
+def extra_key(model, target, name):
+    """
+    text value of extra field extracted from target column
+    """
+    return PostgreSQLExpression(
+        key_text_transform_class()(name, target_column(model, target))
+    )
+
+
+@singledispatch
+def extra_field_output(form_field):
+    """
+    model field used to cast text value of extra field in database,
+    None keeps value as text
+    """
+    return None
+
+
+@extra_field_output.register(forms.BooleanField)
+def boolean_field_output(form_field):
+    return models.BooleanField()
+
+
+@extra_field_output.register(forms.IntegerField)
+def integer_field_output(form_field):
+    return models.IntegerField()
+
+
+@extra_field_output.register(forms.FloatField)
+def float_field_output(form_field):
+    return models.FloatField()
+
+
+@extra_field_output.register(forms.DecimalField)
+def decimal_field_output(form_field):
+    # maximal precision supported by all backends if form doesn't specify it
+    return models.DecimalField(
+        max_digits=form_field.max_digits or 65,
+        decimal_places=form_field.decimal_places or 30,
+    )
+
+
+@extra_field_output.register(forms.DateField)
+def date_field_output(form_field):
+    return models.DateField()
+
+
+@extra_field_output.register(forms.DateTimeField)
+def datetime_field_output(form_field):
+    return models.DateTimeField()
+
+
+@extra_field_output.register(forms.TimeField)
+def time_field_output(form_field):
+    return models.TimeField()
+
+
+def extra_field(model, name):
+    """
+    typed value of extra field extracted from target column
+    """
+    for target in model.get_extra_targets():
+        if name in target.field_names:
+            expression = extra_key(model, target, name)
+            output_field = extra_field_output(target.fields[name])
+            if output_field is None:
+                return expression
+
+            return Cast(expression, output_field)
+
+    raise ValueError('Unknown extra field: {}'.format(name))
+
+
+class ExtraField(Combinable):
+    """
+    reference to extra field in queryset expressions similar to F(),
+    e.g. queryset.aggregate(total=Sum(ExtraField('number')))
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, self.name)
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None,
+                           summarize=False, for_save=False):
+        return extra_field(query.model, self.name).resolve_expression(
+            query, allow_joins, reuse, summarize, for_save
+        )
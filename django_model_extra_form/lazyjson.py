@@ -0,0 +1,132 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+"""
+JSON object decoded on demand, key by key
+"""
+
+from __future__ import unicode_literals, absolute_import
+
+import re
+from json.decoder import scanstring
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # python 2
+    from collections import Mapping
+
+from django.utils.six import text_type
+from json_encoder import json
+
+WHITESPACE = re.compile(r'\s*')
+STRUCTURE = re.compile(r'["{}\[\]]')
+PRIMITIVE_END = re.compile(r'[,}\]\s]|$')
+
+
+def skip_whitespace(string, pos):
+    return WHITESPACE.match(string, pos).end()
+
+
+def skip_value(string, pos):
+    """
+    :return: end position of JSON value starting on pos
+    """
+    char = string[pos:pos + 1]
+    if char == '"':
+        return scanstring(string, pos + 1)[1]
+
+    if char not in ('{', '['):
+        return PRIMITIVE_END.search(string, pos).start()
+
+    depth = 1
+    pos += 1
+    while depth:
+        match = STRUCTURE.search(string, pos)
+        if match is None:
+            raise ValueError('Unterminated JSON value')
+
+        char = match.group()
+        pos = match.end()
+        if char == '"':
+            pos = scanstring(string, pos)[1]
+        elif char in '{[':
+            depth += 1
+        else:
+            depth -= 1
+
+    return pos
+
+
+def index_object(string):
+    """
+    scan top level JSON object without decoding values
+    :return: dictionary of key: (value start, value end)
+    """
+    index = {}
+    pos = skip_whitespace(string, 0)
+    if string[pos:pos + 1] != '{':
+        raise ValueError('JSON object expected')
+
+    pos = skip_whitespace(string, pos + 1)
+    if string[pos:pos + 1] == '}':
+        return index
+
+    while True:
+        if string[pos:pos + 1] != '"':
+            raise ValueError('Expecting property name at {}'.format(pos))
+
+        key, pos = scanstring(string, pos + 1)
+        pos = skip_whitespace(string, pos)
+        if string[pos:pos + 1] != ':':
+            raise ValueError('Expecting ":" at {}'.format(pos))
+
+        start = skip_whitespace(string, pos + 1)
+        end = skip_value(string, start)
+        index[key] = (start, end)
+        pos = skip_whitespace(string, end)
+        char = string[pos:pos + 1]
+        if char == '}':
+            return index
+
+        if char != ',':
+            raise ValueError('Expecting "," at {}'.format(pos))
+
+        pos = skip_whitespace(string, pos + 1)
+
+
+class LazyJSONObject(Mapping):
+    """
+    read only mapping over raw JSON object, keys are indexed on first
+    access and values are decoded (and cached) when they are read
+    """
+
+    def __init__(self, raw):
+        if isinstance(raw, (bytes, bytearray, memoryview)):
+            raw = bytes(raw).decode('utf-8')
+
+        self.raw = raw or '{}'
+        self._index = None
+        self._values = {}
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = index_object(self.raw)
+
+        return self._index
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            start, end = self.index[key]
+            self._values[key] = json.loads(self.raw[start:end])
+
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, text_type(self.raw))
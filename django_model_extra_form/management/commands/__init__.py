@@ -0,0 +1,5 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
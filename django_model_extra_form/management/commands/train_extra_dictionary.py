@@ -0,0 +1,125 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
+
+import random
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+from django.utils.six import text_type
+
+from django_model_extra_form.compression import ALGORITHMS, ZLIB, \
+    CompressedSerializer, compress, train_dictionary
+from django_model_extra_form.models import JSON
+
+# rows read from every random primary key of the sample
+SAMPLE_RUN = 50
+
+
+class Command(BaseCommand):
+    help = 'Train compression dictionary from sample of stored extra data ' \
+           'and report compression ratio.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', help='app_label.ModelName')
+        parser.add_argument('target', help='extra target name')
+        parser.add_argument('output', help='dictionary file path')
+        parser.add_argument('--algorithm', choices=sorted(ALGORITHMS),
+                            default=ZLIB)
+        parser.add_argument('--size', type=int, default=16384,
+                            help='maximal dictionary size in bytes')
+        parser.add_argument('--sample', type=int, default=1000,
+                            help='number of sampled rows')
+        parser.add_argument('--holdout', type=float, default=0.2,
+                            help='part of sampled rows not used for '
+                                 'training, compression ratio is measured '
+                                 'on them')
+        parser.add_argument('--level', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options['model'])
+            target = next(
+                t for t in model.get_extra_targets()
+                if t.name == options['target']
+            )
+        except (LookupError, ValueError, StopIteration, AttributeError):
+            raise CommandError('Unknown extra target {}.{}'.format(
+                options['model'], options['target']
+            ))
+
+        samples = self.get_samples(model, target, options['sample'])
+        if len(samples) < 2:
+            raise CommandError('Not enough stored data to train dictionary '
+                               'from.')
+
+        random.shuffle(samples)
+        split = min(max(int(len(samples) * options['holdout']), 1),
+                    len(samples) - 1)
+        holdout, training = samples[:split], samples[split:]
+
+        algorithm, level = options['algorithm'], options['level']
+        dictionary = train_dictionary(training, options['size'], algorithm)
+        with open(options['output'], 'wb') as fp:
+            fp.write(dictionary)
+
+        size = sum(len(s) for s in holdout)
+        plain = sum(len(compress(algorithm, s, level)) for s in holdout)
+        trained = sum(
+            len(compress(algorithm, s, level, dictionary)) for s in holdout
+        )
+        self.stdout.write(
+            'Dictionary of {} bytes trained from {} rows.\n'
+            'Compression ratios measured on {} other rows ({} bytes).\n'
+            'Compression ratio without dictionary: {:.2f}\n'
+            'Compression ratio with dictionary: {:.2f}'.format(
+                len(dictionary), len(training), len(holdout), size,
+                float(size) / plain, float(size) / trained,
+            )
+        )
+
+    def get_samples(self, model, target, count):
+        """
+        uncompressed stored data of random rows, runs of rows are read
+        from random integer primary keys instead of sorting whole table,
+        first rows are read for other primary keys
+        """
+        queryset = model._base_manager.exclude(**{
+            '{}__isnull'.format(target.name): True,
+        }).order_by('pk')
+        bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+        low, high = bounds['low'], bounds['high']
+        values = {}
+        if isinstance(low, int) and high - low >= count:
+            # runs overlap or are cut by the end of table sometimes
+            for _ in range(2 * ((count + SAMPLE_RUN - 1) // SAMPLE_RUN)):
+                if len(values) >= count:
+                    break
+
+                start = random.randint(low, high)
+                values.update(queryset.filter(pk__gte=start).values_list(
+                    'pk', target.name
+                )[:SAMPLE_RUN])
+        else:
+            values.update(queryset.values_list('pk', target.name)[:count])
+
+        serializer = target.serializer
+        if not issubclass(serializer, CompressedSerializer):
+            serializer = CompressedSerializer
+
+        samples = []
+        for value in list(values.values())[:count]:
+            if isinstance(value, text_type):
+                value = value.encode('utf-8')
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                value = serializer.decompress(value)
+            else:  # decoded by database field, e.g. JSONField
+                value = JSON.dumps(value).encode('utf-8')
+
+            if value:
+                samples.append(value)
+
+        return samples
@@ -7,14 +7,37 @@ from __future__ import unicode_literals, absolute_import
 from collections import OrderedDict
 
 from django import forms
-from django.utils.six import iterkeys
-from json_encoder import json
+from django.db import connections, models, router, transaction
+from django.db.models.query import ModelIterable
+from django.db.models.signals import class_prepared, post_delete
+from django.dispatch import receiver, Signal
+from django.utils.six import iterkeys, iteritems
 
 from django_model_extra_form.forms.utils import validate_form, form_data, \
-    set_form_data_to_instance, get_form_data_from_instance
+    trusted_form_data
+
+
+class NotLoaded(object):
+
+    def __repr__(self):
+        return 'NOT_LOADED'
+
+
+# old value of extra attribute in delta when stored data weren't loaded,
+# e.g. new instances, None is a valid loaded value
+NOT_LOADED = NotLoaded()
+
+# sent by ExtraFormMixin.save() with instance, using and delta of changed
+# extra attributes (see ExtraFormMixin.extra_delta), {target name:
+# {field name: (old value, new value)}}, old value is NOT_LOADED when
+# stored data weren't loaded
+extra_data_changed = Signal()
 
 
 class ExtraTargetSerializer(object):
+    # loads returns mapping decoding values on access
+    lazy = False
+
     @classmethod
     def loads(cls, data):
         raise NotImplementedError
@@ -35,21 +58,119 @@ class RAW(ExtraTargetSerializer):
         return data
 
 
+_json = None
+
+
+def json_module():
+    """
+    json_encoder module imported on first use
+    """
+    global _json
+    if _json is None:
+        from json_encoder import json
+        _json = json
+
+    return _json
+
+
 class JSON(ExtraTargetSerializer):
 
     @classmethod
     def loads(cls, data):
-        return json.loads(data or '{}')
+        return (_json or json_module()).loads(data or '{}')
 
     @classmethod
     def dumps(cls, data):
-        return json.dumps(data)
+        return (_json or json_module()).dumps(data)
+
+
+class LazyJSON(JSON):
+    """
+    JSON decoded key by key on access, see ExtraTarget.decodes_lazily
+    """
+    lazy = True
+
+    @classmethod
+    def loads(cls, data):
+        from django_model_extra_form.lazyjson import LazyJSONObject
+        return LazyJSONObject(data)
+
+
+class MergeConflictError(Exception):
+
+    def __init__(self, conflicts, message=None):
+        """
+        :param conflicts: {key: (loaded value, stored value, new value)}
+        """
+        self.conflicts = conflicts
+        super(MergeConflictError, self).__init__(
+            message or 'Conflicting extra data: {}'.format(
+                ', '.join(sorted(conflicts))
+            )
+        )
+
+
+def merge_extra_data(stored, loaded, changed):
+    """
+    merge changed extra data into stored data
+    :param stored: currently stored data
+    :param loaded: data loaded before change
+    :param changed: changed data
+    :return: merged data
+    """
+    conflicts = dict(
+        (key, (loaded[key], stored.get(key), value))
+        for key, value in iteritems(changed)
+        if key in loaded and stored.get(key) not in (loaded[key], value)
+    )
+    if conflicts:
+        raise MergeConflictError(conflicts)
+
+    merged = OrderedDict(stored)
+    merged.update(changed)
+    return merged
+
+
+class ColumnStorage(object):
+    """
+    serialized extra data kept in model field named as target
+    """
+    serializer = JSON
+    # target name is concrete model field
+    has_column = True
+
+    def get_data(self, target, instance):
+        return getattr(instance, target.name, None)
+
+    def set_data(self, target, instance, value):
+        setattr(instance, target.name, value)
+
+    def prefetch(self, target, instances):
+        """
+        load stored data of all instances at once before they are read
+        """
+
+    def save(self, target, instance, using=None):
+        """
+        write data set by set_data, called after instance is saved
+        """
+
+    def save_many(self, target, instances, using=None):
+        for instance in instances:
+            self.save(target, instance, using)
+
+    def delete(self, target, instance, using=None):
+        """
+        remove stored data, called after instance is deleted
+        """
 
 
 class ExtraTarget(object):
 
     def __init__(self, name, *extra_forms, **kwargs):
-        serializer = kwargs.get('serializer') or JSON
+        # where serialized data are kept, ColumnStorage by default
+        self.storage = kwargs.get('storage') or ColumnStorage()
+        serializer = kwargs.get('serializer') or self.storage.serializer
         assert issubclass(serializer, ExtraTargetSerializer)
         self.name = name
         self.extra_forms = tuple(
@@ -57,6 +178,29 @@ class ExtraTarget(object):
             for form in extra_forms
         )
         self.serializer = serializer
+        # version stamped into every serialized data, None to disable
+        self.version = kwargs.get('version')
+        # {version: callable} upgrading data from version to version + 1
+        self.upgrades = kwargs.get('upgrades') or {}
+        self.version_key = kwargs.get('version_key') or '_version'
+        # rewrite outdated data on save even if it wasn't read
+        self.write_back = kwargs.get('write_back', False)
+        # data written by save() are decoded without forms validation on read
+        self.trusted = kwargs.get('trusted', False)
+        # extra fields mirrored into concrete model fields of the same name,
+        # the new columns are NULL until they are backfilled, run
+        # ExtraFormQuerySet.sync_shadow_fields() right after the schema
+        # migration, stored data are rewritten from the columns otherwise
+        self.shadow_fields = tuple(kwargs.get('shadow_fields') or ())
+        # existing rows merge changed keys into stored data on save
+        self.optimistic = kwargs.get('optimistic', False)
+        self.merge_retries = kwargs.get('merge_retries', 3)
+        if not self.storage.has_column and (
+                self.optimistic or self.version is not None):
+            raise ValueError(
+                'Extra target {!r} stored apart from model rows supports '
+                'neither merging nor versioning'.format(name)
+            )
 
     @property
     def field_names(self):
@@ -77,30 +221,266 @@ class ExtraTarget(object):
 
         return cleaned
 
+    def trusted_data(self, data):
+        trusted = OrderedDict()
+        for form in self.extra_forms:
+            trusted.update(form.trusted_data(data))
+
+        return trusted
+
+    def clean_data_many(self, data_list, validate=True):
+        cleaned = [OrderedDict() for _ in data_list]
+        for form in self.extra_forms:
+            form_cleaned = form.clean_data_many(data_list, validate)
+            for result, data in zip(cleaned, form_cleaned):
+                result.update(data)
+
+        return cleaned
+
     def serialize(self, data, validate=True):
         data = self.clean_data(data, validate)
+        if self.version is not None:
+            data[self.version_key] = self.version
+
         return self.serializer.dumps(data)
 
-    def deserialize(self, data, validate=True):
-        data = self.serializer.loads(data)
+    def deserialize(self, data, validate=True, trusted=False):
+        """
+        :param trusted: decode field types only, forms aren't used at all
+        """
+        data = self.upgrade(self.serializer.loads(data))
+        if trusted:
+            return self.trusted_data(data)
+
         return self.clean_data(data, validate)
 
+    def deserialize_many(self, values, validate=True, trusted=False):
+        """
+        deserialize list of values sharing form instances
+        """
+        data_list = [self.upgrade(self.serializer.loads(v)) for v in values]
+        if trusted:
+            return [self.trusted_data(data) for data in data_list]
+
+        return self.clean_data_many(data_list, validate)
+
+    def data_version(self, data):
+        """
+        version of loaded data, unversioned data are version 0
+        """
+        return (data or {}).get(self.version_key, 0)
+
+    def upgrade(self, data):
+        """
+        upgrade loaded data to current version
+        """
+        if self.version is None:
+            return data
+
+        version = self.data_version(data)
+        if version == self.version:
+            return data  # fast path, data are up to date
+
+        data = dict(data or {})
+        while version < self.version:
+            if version in self.upgrades:
+                data = self.upgrades[version](data)
+
+            version += 1
+
+        return data
+
+    def is_outdated(self, instance):
+        value = self.get_data(instance)
+        if self.version is None or not value:
+            return False
+
+        return self.data_version(self.serializer.loads(value)) != self.version
+
     def extra_data_parsed(self, instance):
-        extra_data = self.deserialize(self.get_data(instance), validate=False)
+        extra_data = self.deserialize(
+            self.get_data(instance), validate=False, trusted=self.trusted
+        )
+        return extra_data
+
+    @property
+    def decodes_lazily(self):
+        """
+        attributes are decoded one by one from raw data, it needs lazy
+        serializer and trusted data without versioning
+        """
+        return self.serializer.lazy and self.trusted and self.version is None
+
+    def lazy_value(self, instance, name):
+        """
+        decode single extra field, loaded data are cached on instance
+        """
+        value = self.get_data(instance)
+        cache_name = '_extra_lazy_{}'.format(self.name)
+        cached = instance.__dict__.get(cache_name)
+        if cached is None or cached[0] is not value:
+            cached = (value, self.serializer.loads(value))
+            instance.__dict__[cache_name] = cached
+
+        field = self.fields[name]
+        data = trusted_form_data({name: field}, cached[1])
+        self.remember_loaded(instance, data)
+        return data[name]
+
+    def remember_loaded(self, instance, data):
+        """
+        keep loaded extra data to find changed attributes later
+        """
+        loaded = instance._extra_loaded.setdefault(self.name, {})
+        for name, value in iteritems(data):
+            # first loaded value is kept, e.g. shadow column value
+            loaded.setdefault(name, value)
+
+    def hydrate(self, instance, extra_data=None):
+        """
+        set parsed extra data to instance attributes which are missing,
+        data aren't parsed when no attribute is missing
+        """
+        missing = self.missing_attributes(instance)
+        if missing and extra_data is None:
+            extra_data = self.extra_data_parsed(instance)
+
+        if extra_data is not None:
+            self.remember_loaded(instance, extra_data)
+
+        for key in missing:
+            # set extra data for missing instance attributes only
+            setattr(instance, key, extra_data[key])
+
         return extra_data
 
+    def changed_data(self, instance):
+        """
+        extra attributes which differ from loaded data or weren't loaded
+        """
+        loaded = instance._extra_loaded.get(self.name, {})
+        values = instance.__dict__
+        return OrderedDict(
+            (name, values[name]) for name in self.field_names
+            if name in values and (
+                name not in loaded or loaded[name] != values[name]
+            )
+        )
+
+    def changed_delta(self, instance):
+        """
+        changed attributes with their loaded values, old value is
+        NOT_LOADED when it wasn't loaded
+        :return: {field name: (old value, new value)}
+        """
+        loaded = instance._extra_loaded.get(self.name, {})
+        return OrderedDict(
+            (name, (loaded.get(name, NOT_LOADED), value))
+            for name, value in iteritems(self.changed_data(instance))
+        )
+
+    def merge(self, instance, using=None):
+        """
+        merge changed attributes into stored data using compare-and-swap
+        of whole stored value, it's retried when stored value was changed
+        meanwhile, MergeConflictError is raised for keys changed by both
+        """
+        changed = self.changed_data(instance)
+        if not changed:
+            return
+
+        loaded = instance._extra_loaded.get(self.name, {})
+        queryset = type(instance)._base_manager.using(using).filter(
+            pk=instance.pk
+        )
+        for _ in range(self.merge_retries):
+            stored = queryset.values_list(self.name, flat=True).get()
+            merged = merge_extra_data(
+                self.deserialize(stored, validate=False, trusted=self.trusted),
+                loaded, changed
+            )
+            value = self.serialize(merged)
+            if queryset.filter(**{self.name: stored}).update(
+                    **{self.name: value}):
+                break
+        else:
+            raise MergeConflictError(
+                {}, 'Stored data of {!r} target are changed too often'.format(
+                    self.name
+                )
+            )
+
+        self.set_data(instance, value)
+        instance._extra_loaded[self.name] = dict(merged)
+        for name, merged_value in iteritems(merged):
+            if name in instance.__dict__:
+                # refresh keys changed by others
+                instance.__dict__[name] = merged_value
+
+    def missing_attributes(self, instance):
+        values = instance.__dict__
+        model_class = type(instance)
+        return set(
+            name for name in self.field_names
+            if name not in values and not hasattr(model_class, name)
+        )
+
     def get_data(self, instance):
-        return getattr(instance, self.name, None)
+        return self.storage.get_data(self, instance)
 
     def set_data(self, instance, value):
-        setattr(instance, self.name, value)
+        self.storage.set_data(self, instance, value)
 
     def data_from_attributes(self, instance):
         return {name: getattr(instance, name) for name in self.field_names}
 
     def data_in_attributes(self, instance):
-        attributes = dir(instance)
-        return any(name in attributes for name in self.field_names)
+        """
+        some extra attribute is set, shadow fields are set always and
+        they count only when they differ from loaded values
+        """
+        values = instance.__dict__
+        loaded = instance._extra_loaded.get(self.name, {})
+        model_class = type(instance)
+        for name in self.field_names:
+            if name in self.shadow_fields:
+                if name in values and (
+                        name not in loaded or loaded[name] != values[name]):
+                    return True
+
+            elif name in values or hasattr(model_class, name):
+                return True
+
+        return False
+
+
+def shadow_field(form_field):
+    """
+    concrete model field mirroring extra form field
+    """
+    if isinstance(form_field, forms.CharField):
+        if form_field.max_length is None:
+            raise ValueError(
+                'max_length of {} is required to mirror it into model '
+                'field'.format(type(form_field).__name__)
+            )
+
+        return models.CharField(
+            max_length=form_field.max_length, null=True, blank=True,
+            db_index=True, editable=False,
+        )
+
+    from django_model_extra_form.expressions import extra_field_output
+
+    output_field = extra_field_output(form_field)
+    if output_field is None:
+        raise ValueError('{} can not be mirrored into model field'.format(
+            type(form_field).__name__
+        ))
+
+    name, path, args, kwargs = output_field.deconstruct()
+    kwargs.update(null=True, blank=True, db_index=True, editable=False)
+    return type(output_field)(*args, **kwargs)
 
 
 class ExtraForm(object):
@@ -122,6 +502,25 @@ class ExtraForm(object):
         validate_form(form) if validate else form.full_clean()
         return form_data(form)
 
+    def clean_data_many(self, data_list, validate=True):
+        """
+        clean list of data with one form instance, form fields are
+        copied once instead of for every data
+        """
+        form = self.form_class(data={})
+        cleaned = []
+        for data in data_list:
+            form.data = data
+            form._errors = None
+            form._bound_fields_cache = {}
+            validate_form(form) if validate else form.full_clean()
+            cleaned.append(form_data(form))
+
+        return cleaned
+
+    def trusted_data(self, data):
+        return trusted_form_data(self.fields, data)
+
 
 class ExtraFormMixin(object):
     """
@@ -131,48 +530,552 @@ class ExtraFormMixin(object):
     extra_targets = tuple()
 
     def __init__(self, *args, **kwargs):
-        # TODO move this somewhere to run it once per class, not instance
-        self.extra_targets = tuple(
-            target if isinstance(target, ExtraTarget) else ExtraTarget(*target)
-            for target in self.extra_targets
-        )
+        self.extra_targets = self.get_extra_targets()
+        # names of targets with extra data set by set_extra_data()
+        self._extra_dirty = set()
+        # {target name: loaded extra data}
+        self._extra_loaded = {}
 
         if kwargs:
             # set extra form data to instance,
             # it's possible for named arguments only
             for target in self.extra_targets:
                 for name in target.field_names:
-                    if name in kwargs:
+                    if name in kwargs and name not in target.shadow_fields:
                         setattr(self, name, kwargs.pop(name))
 
         super(ExtraFormMixin, self).__init__(*args, **kwargs)
 
+    @classmethod
+    def get_extra_targets(cls):
+        """
+        extra targets built once per class
+        """
+        if '_extra_targets' not in cls.__dict__:
+            cls._extra_targets = tuple(
+                t if isinstance(t, ExtraTarget) else ExtraTarget(*t)
+                for t in cls.extra_targets
+            )
+
+        return cls._extra_targets
+
+    @classmethod
+    def contribute_shadow_fields(cls):
+        """
+        add concrete model fields mirroring extra fields listed in
+        ExtraTarget.shadow_fields, fields declared on model or inherited
+        from parent model are kept,
+        columns added to existing table have to be backfilled by
+        ExtraFormQuerySet.sync_shadow_fields() before next save
+        """
+        if cls._meta.proxy:
+            return  # fields of concrete model are used
+
+        # forward fields including inherited ones of multi-table children,
+        # reverse relations aren't ready while models are being loaded
+        existing = set(
+            f.name for f in cls._meta.fields + cls._meta.many_to_many
+        )
+        for target in cls.get_extra_targets():
+            fields = target.fields
+            for name in target.shadow_fields:
+                if name not in existing:
+                    cls.add_to_class(name, shadow_field(fields[name]))
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(ExtraFormMixin, cls).from_db(db, field_names, values)
+        instance.remember_shadow_fields()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super(ExtraFormMixin, self).refresh_from_db(using, fields)
+        self.remember_shadow_fields()
+
+    def remember_shadow_fields(self):
+        """
+        values of loaded shadow columns are loaded extra data, untouched
+        shadow fields aren't changed then
+        """
+        values = self.__dict__
+        for target in self.extra_targets:
+            if not target.shadow_fields:
+                continue
+
+            self._extra_loaded.setdefault(target.name, {}).update(
+                (name, values[name]) for name in target.shadow_fields
+                if name in values
+            )
+
     def __getattr__(self, name):
         for target in self.extra_targets:
             if name in target.field_names:
-                extra_data = target.extra_data_parsed(self)
-                for key in set(target.field_names) - set(dir(self)):
-                    # set extra data for missing instance attributes only
-                    setattr(self, key, extra_data[key])
+                if target.decodes_lazily:
+                    value = target.lazy_value(self, name)
+                    setattr(self, name, value)
+                    return value
 
-                return extra_data[name]
+                return target.hydrate(self)[name]
 
         return super(ExtraFormMixin, self).__getattr__(name)
 
+    def hydrate_extra(self):
+        """
+        parse all extra targets at once instead of on first attribute access
+        """
+        hydrate_extra_targets([self])
+
+    def ahydrate_extra(self, executor=None):
+        from django_model_extra_form.aio import ahydrate_extra_targets
+        return ahydrate_extra_targets([self], executor)
+
+    def set_extra_data(self, data):
+        """
+        set extra attributes at once and mark their targets dirty,
+        other keys are set as common attributes
+        """
+        extra_data = {}
+        for target in self.extra_targets:
+            names = [n for n in target.field_names if n in data]
+            if names:
+                extra_data.update((n, data[n]) for n in names)
+                self._extra_dirty.add(target.name)
+
+        self.__dict__.update(extra_data)
+        for key in set(data) - set(extra_data):
+            setattr(self, key, data[key])
+
+    def get_extra_data(self, field_names):
+        """
+        read extra attributes at once, targets are hydrated once
+        """
+        for target in self.extra_targets:
+            if any(n in field_names for n in target.field_names):
+                target.hydrate(self)
+
+        values = self.__dict__
+        return OrderedDict(
+            (n, values[n] if n in values else getattr(self, n))
+            for n in field_names
+        )
+
     def set_data_from_form(self, form):
-        set_form_data_to_instance(form, self)
+        self.set_extra_data(form_data(form, dict))
 
     def get_data_for_form(self, form):
-        return get_form_data_from_instance(form, self)
+        return self.get_extra_data(list(form.base_fields))
+
+    def serialize_extra(self, targets=None):
+        """
+        serialize extra attributes into target fields
+        """
+        for target in self.extra_targets if targets is None else targets:
+            if target.name in self._extra_dirty or not target.get_data(self) \
+                    or target.data_in_attributes(self) \
+                    or (target.write_back and target.is_outdated(self)):
+                data = target.data_from_attributes(self)
+                target.set_data(self, target.serialize(data))
+                self._extra_loaded[target.name] = data
+
+            self._extra_dirty.discard(target.name)
+
+    def extra_delta(self):
+        """
+        changed extra attributes of all targets from instance change
+        tracking, nothing is decoded
+        :return: {target name: {field name: (old value, new value)}}
+        """
+        delta = OrderedDict()
+        for target in self.extra_targets:
+            target_delta = target.changed_delta(self)
+            if target_delta:
+                delta[target.name] = target_delta
+
+        return delta
 
     def save(self, force_insert=False, force_update=False, using=None,
              update_fields=None):
-        for target in self.extra_targets:
-            if not target.get_data(self) or target.data_in_attributes(self):
-                target.set_data(
-                    self, target.serialize(target.data_from_attributes(self))
-                )
+        # delta is captured before serialization resets change tracking
+        delta = self.extra_delta() if extra_data_changed.has_listeners(
+            type(self)
+        ) else None
+        optimistic = [] if force_insert or self._state.adding else [
+            t for t in self.extra_targets if t.optimistic
+        ]
+        self.serialize_extra(
+            [t for t in self.extra_targets if t not in optimistic]
+        )
+        stored_apart = [
+            t for t in self.extra_targets if not t.storage.has_column
+        ]
+        if not optimistic and not stored_apart:
+            result = super(ExtraFormMixin, self).save(
+                force_insert, force_update, using, update_fields
+            )
+        else:
+            result = self.save_extra_apart(
+                optimistic, stored_apart, force_insert, force_update, using,
+                update_fields
+            )
+
+        if delta:
+            extra_data_changed.send(
+                sender=type(self), instance=self, delta=delta,
+                using=self._state.db,
+            )
+
+        return result
+
+    def save_extra_apart(self, optimistic, stored_apart, force_insert=False,
+                         force_update=False, using=None, update_fields=None):
+        """
+        save instance and targets written apart from model row in one
+        transaction, optimistic targets are merged after other fields
+        are updated
+        """
+        using = using or router.db_for_write(type(self), instance=self)
+        if update_fields is not None:
+            # other targets are left changed as other fields are
+            optimistic = [t for t in optimistic if t.name in update_fields]
 
-        return super(ExtraFormMixin, self).save(
+        if optimistic:
+            names = set(t.name for t in optimistic)
+            if update_fields is None:
+                # deferred fields aren't loaded and written as save() does
+                deferred = self.get_deferred_fields() \
+                    if using == self._state.db else set()
+                update_fields = [
+                    f.name for f in self._meta.concrete_fields
+                    if not f.primary_key and f.attname not in deferred
+                ]
+
+            update_fields = [
+                name for name in update_fields if name not in names
+            ]
+
+        with transaction.atomic(using=using):
+            result = super(ExtraFormMixin, self).save(
+                force_insert, force_update, using, update_fields
+            )
+            for target in optimistic:
+                target.merge(self, using)
+
+            for target in stored_apart:
+                target.storage.save(target, self, using)
+
+        return result
+
+    def asave(self, force_insert=False, force_update=False, using=None,
+              update_fields=None):
+        from django_model_extra_form.aio import database_sync_to_async
+        return database_sync_to_async(self.save)(
             force_insert, force_update, using, update_fields
-        )
\ No newline at end of file
+        )
+
+
+def hydrate_extra_targets(instances):
+    """
+    parse extra targets for all instances, every target is parsed
+    at once for all instances sharing form instances
+    :param instances: iterable of ExtraFormMixin instances
+    :return: list of hydrated instances
+    """
+    instances = list(instances)
+    pending = OrderedDict()
+    for instance in instances:
+        for target in instance.extra_targets:
+            if target.missing_attributes(instance):
+                pending.setdefault(target, []).append(instance)
+
+    for target, target_instances in iteritems(pending):
+        target.storage.prefetch(target, target_instances)
+        parsed = target.deserialize_many(
+            [target.get_data(instance) for instance in target_instances],
+            validate=False, trusted=target.trusted,
+        )
+        for instance, extra_data in zip(target_instances, parsed):
+            target.hydrate(instance, extra_data)
+
+    return instances
+
+
+def prefetch_extra_storage(instances):
+    """
+    load data of extra targets stored apart from model rows (see
+    ExtraTarget.storage) for all instances at once
+    :param instances: iterable of model instances
+    """
+    pending = OrderedDict()
+    for instance in instances:
+        if isinstance(instance, ExtraFormMixin):
+            for target in instance.extra_targets:
+                if not target.storage.has_column:
+                    pending.setdefault(target, []).append(instance)
+
+    for target, target_instances in iteritems(pending):
+        target.storage.prefetch(target, target_instances)
+
+
+def export_extra_data(instances, field_names=None):
+    """
+    generate primary key and extra data of every instance
+    :param instances: iterable of ExtraFormMixin instances
+    :param field_names: extra field names to export, all fields by default
+    """
+    for instance in instances:
+        data = OrderedDict([('pk', instance.pk)])
+        for target in instance.extra_targets:
+            names = target.field_names if field_names is None else [
+                n for n in target.field_names if n in field_names
+            ]
+            # first missing attribute parses whole target
+            data.update((n, getattr(instance, n)) for n in names)
+
+        yield data
+
+
+def chunked(iterable, chunk_size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+# prefix of annotations holding extra field values selected from database
+EXTRA_ANNOTATION_PREFIX = '_extra_only_'
+
+
+def set_extra_annotations(instance):
+    """
+    move extra field values selected by ExtraFormQuerySet.only_extra()
+    from annotations into extra attributes
+    """
+    values = dict(
+        (name[len(EXTRA_ANNOTATION_PREFIX):], instance.__dict__.pop(name))
+        for name in list(instance.__dict__)
+        if name.startswith(EXTRA_ANNOTATION_PREFIX)
+    )
+    for target in instance.extra_targets:
+        fields = OrderedDict(
+            (name, field) for name, field in iteritems(target.fields)
+            if name in values
+        )
+        data = trusted_form_data(fields, values)
+        target.remember_loaded(instance, data)
+        for name, value in iteritems(data):
+            setattr(instance, name, value)
+
+
+class ExtraModelIterable(ModelIterable):
+
+    def __iter__(self):
+        for obj in super(ExtraModelIterable, self).__iter__():
+            set_extra_annotations(obj)
+            yield obj
+
+
+class ExtraFormQuerySet(models.QuerySet):
+
+    def __init__(self, *args, **kwargs):
+        super(ExtraFormQuerySet, self).__init__(*args, **kwargs)
+        self._prefetch_extra = False
+
+    def _clone(self, *args, **kwargs):
+        clone = super(ExtraFormQuerySet, self)._clone(*args, **kwargs)
+        clone._prefetch_extra = self._prefetch_extra
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super(ExtraFormQuerySet, self)._fetch_all()
+        if self._prefetch_extra and not fetched:
+            prefetch_extra_storage(self._result_cache)
+
+    def prefetch_extra(self):
+        """
+        load extra targets stored apart from model rows (e.g.
+        storage.SideTableStorage) for all instances when queryset is
+        evaluated, one query per target
+        """
+        clone = self._chain()
+        clone._prefetch_extra = True
+        return clone
+
+    def only_extra(self, *field_names):
+        """
+        select given extra fields only instead of whole target columns,
+        values are decoded as trusted data (see ExtraTarget.trusted),
+        other extra fields load deferred target column on access,
+        PostgreSQL is required (NotSupportedError is raised otherwise)
+        """
+        from django_model_extra_form.expressions import check_postgresql, \
+            extra_key
+
+        check_postgresql(connections[self.db])
+
+        annotations = {}
+        deferred = []
+        for target in self.model.get_extra_targets():
+            names = [n for n in target.field_names if n in field_names]
+            for name in names:
+                annotations[EXTRA_ANNOTATION_PREFIX + name] = extra_key(
+                    self.model, target, name
+                )
+
+            if names:
+                deferred.append(target.name)
+
+        unknown = set(field_names) - set(
+            n[len(EXTRA_ANNOTATION_PREFIX):] for n in annotations
+        )
+        if unknown:
+            raise ValueError('Unknown extra fields: {}'.format(
+                ', '.join(sorted(unknown))
+            ))
+
+        queryset = self.annotate(**annotations).defer(*deferred)
+        queryset._iterable_class = ExtraModelIterable
+        return queryset
+
+    def annotate_extra(self, *field_names):
+        """
+        annotate extra fields cast to their database types, e.g.
+        queryset.annotate_extra('date').values('date').annotate(Count('pk')),
+        PostgreSQL is required (NotSupportedError is raised otherwise)
+        """
+        from django_model_extra_form.expressions import check_postgresql, \
+            ExtraField
+
+        check_postgresql(connections[self.db])
+        return self.annotate(**dict((n, ExtraField(n)) for n in field_names))
+
+    def hydrate_extra(self):
+        """
+        evaluate queryset and parse extra targets of all instances
+        """
+        return hydrate_extra_targets(self)
+
+    def export_extra(self, field_names=None, chunk_size=2000):
+        """
+        stream extra data without caching instances in queryset
+        """
+        for chunk in chunked(self.iterator(chunk_size=chunk_size), chunk_size):
+            prefetch_extra_storage(chunk)
+            for data in export_extra_data(chunk, field_names):
+                yield data
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        data of targets stored apart from model rows need primary keys
+        returned by database, ValueError is raised otherwise
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.serialize_extra()
+
+        stored_apart = [
+            t for t in self.model.get_extra_targets()
+            if not t.storage.has_column
+        ]
+        if not stored_apart:
+            return super(ExtraFormQuerySet, self).bulk_create(
+                objs, *args, **kwargs
+            )
+
+        with transaction.atomic(using=self.db):
+            result = super(ExtraFormQuerySet, self).bulk_create(
+                objs, *args, **kwargs
+            )
+            for target in stored_apart:
+                target.storage.save_many(target, objs, self.db)
+
+        return result
+
+    def bulk_update_extra(self, objs, batch_size=None):
+        """
+        serialize extra attributes and update target fields only
+        """
+        objs = list(objs)
+        if not objs:
+            return
+
+        # unchanged fields of targets stored apart are read at once
+        prefetch_extra_storage(objs)
+        for obj in objs:
+            obj.serialize_extra()
+
+        fields = [
+            name for target in objs[0].extra_targets
+            for name in (
+                (target.name, ) if target.storage.has_column else ()
+            ) + target.shadow_fields
+        ]
+        with transaction.atomic(using=self.db):
+            if fields:
+                self.bulk_update(objs, fields, batch_size=batch_size)
+
+            for target in objs[0].extra_targets:
+                if not target.storage.has_column:
+                    target.storage.save_many(target, objs, self.db)
+
+    def sync_shadow_fields(self, batch_size=1000):
+        """
+        copy stored extra data into shadow fields, run it right after new
+        shadow field was added and before instances are saved
+        """
+        targets = [
+            t for t in self.model.get_extra_targets() if t.shadow_fields
+        ]
+        fields = [name for t in targets for name in t.shadow_fields]
+        if not fields:
+            return
+
+        queryset = self.order_by('pk')
+        for chunk in chunked(queryset.iterator(chunk_size=batch_size),
+                             batch_size):
+            for obj in chunk:
+                for target in targets:
+                    extra_data = target.extra_data_parsed(obj)
+                    for name in target.shadow_fields:
+                        setattr(obj, name, extra_data[name])
+
+            self.bulk_update(chunk, fields, batch_size=batch_size)
+
+    def ahydrate_extra(self, executor=None):
+        from django_model_extra_form.aio import ahydrate_extra_targets
+        return ahydrate_extra_targets(self, executor)
+
+    def aexport_extra(self, field_names=None, chunk_size=2000, executor=None):
+        from django_model_extra_form.aio import aexport_extra_data
+        return aexport_extra_data(self, field_names, chunk_size, executor)
+
+
+ExtraFormManager = models.Manager.from_queryset(ExtraFormQuerySet)
+
+
+@receiver(class_prepared)
+def add_shadow_fields(sender, **kwargs):
+    if issubclass(sender, ExtraFormMixin):
+        sender.contribute_shadow_fields()
+
+
+def delete_extra_storage(sender, instance, using=None, **kwargs):
+    for target in instance.extra_targets:
+        target.storage.delete(target, instance, using)
+
+
+@receiver(class_prepared)
+def connect_extra_storage(sender, **kwargs):
+    """
+    delete data stored apart from model rows with instances, signal is
+    connected per model to keep fast deletes of other models
+    """
+    if issubclass(sender, ExtraFormMixin) and not sender._meta.abstract \
+            and any(not t.storage.has_column
+                    for t in sender.get_extra_targets()):
+        post_delete.connect(delete_extra_storage, sender=sender, weak=False)
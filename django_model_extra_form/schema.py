@@ -0,0 +1,227 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+"""
+Batched migration of stored extra data to current ExtraTarget forms schema
+"""
+
+from __future__ import unicode_literals, absolute_import
+
+import time
+from collections import OrderedDict
+
+from django.utils.six import iteritems
+
+from django_model_extra_form.models import MergeConflictError
+
+
+def target_schema(target):
+    """
+    JSON serializable snapshot of target schema, store it together with
+    code to diff it later against changed forms
+    """
+    return OrderedDict(
+        (name, {
+            'type': '{}.{}'.format(type(field).__module__,
+                                   type(field).__name__),
+            'required': bool(field.required),
+        })
+        for name, field in iteritems(target.fields)
+    )
+
+
+class Operation(object):
+
+    def apply(self, data):
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(*item) for item in sorted(iteritems(vars(self)))
+        ))
+
+
+class AddField(Operation):
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+
+    def apply(self, data):
+        if self.default is not None:
+            data.setdefault(self.name, self.default)
+        # otherwise form initial value is used during clean
+
+        return data
+
+
+class RemoveField(Operation):
+
+    def __init__(self, name):
+        self.name = name
+
+    def apply(self, data):
+        data.pop(self.name, None)
+        return data
+
+
+class RenameField(Operation):
+
+    def __init__(self, old_name, new_name):
+        self.old_name = old_name
+        self.new_name = new_name
+
+    def apply(self, data):
+        if self.old_name in data:
+            data[self.new_name] = data.pop(self.old_name)
+
+        return data
+
+
+class AlterField(Operation):
+
+    def __init__(self, name, convert=None):
+        """
+        :param convert: callable converting old value into new one,
+            value is coerced by new form field during clean by default
+        """
+        self.name = name
+        self.convert = convert
+
+    def apply(self, data):
+        if self.convert is not None and self.name in data:
+            data[self.name] = self.convert(data[self.name])
+
+        return data
+
+
+def diff_schema(snapshot, target, renames=None):
+    """
+    generate operations migrating data stored with snapshot schema
+    into current target schema
+    :param snapshot: result of target_schema() stored previously
+    :param renames: dictionary of old field name to new field name
+    :return: list of operations
+    """
+    renames = renames or {}
+    current = target_schema(target)
+    operations = []
+    for old_name, new_name in iteritems(renames):
+        operations.append(RenameField(old_name, new_name))
+
+    for name in snapshot:
+        if name not in current and name not in renames:
+            operations.append(RemoveField(name))
+
+    renamed_from = dict((new, old) for old, new in iteritems(renames))
+    for name, field_schema in iteritems(current):
+        old_name = renamed_from.get(name, name)
+        if old_name not in snapshot:
+            operations.append(AddField(name))
+
+        elif snapshot[old_name]['type'] != field_schema['type']:
+            operations.append(AlterField(name))
+
+    return operations
+
+
+class ExtraMigration(object):
+    """
+    rewrite stored target data in batches ordered by primary key,
+    it can run while the data are written by others
+    """
+
+    def __init__(self, model, target_name, operations):
+        self.model = model
+        self.target = next(
+            t for t in model.get_extra_targets() if t.name == target_name
+        )
+        self.operations = list(operations)
+
+    @classmethod
+    def from_snapshot(cls, model, target_name, snapshot, renames=None):
+        migration = cls(model, target_name, [])
+        migration.operations = diff_schema(
+            snapshot, migration.target, renames
+        )
+        return migration
+
+    def migrate_value(self, value):
+        target = self.target
+        data = dict(target.upgrade(target.serializer.loads(value)))
+        for operation in self.operations:
+            data = operation.apply(data)
+
+        return self.target.serialize(data, validate=False)
+
+    def write(self, queryset, rows):
+        """
+        write migrated values of rows which weren't changed since they
+        were read, every value is compared and swapped by one update
+        :param rows: list of (primary key, stored value)
+        :return: primary keys of rows changed meanwhile
+        """
+        name = self.target.name
+        changed = []
+        for pk, value in rows:
+            migrated = self.migrate_value(value)
+            if migrated != value and not queryset.filter(
+                    pk=pk, **{name: value}).update(**{name: migrated}):
+                changed.append(pk)
+
+        return changed
+
+    def run(self, batch_size=1000, start_pk=None, end_pk=None, sleep=0,
+            using=None, retries=3):
+        """
+        migrate stored data, only changed rows are written, rows written
+        concurrently are read and migrated again
+        :param start_pk: exclusive primary key to resume migration after
+        :param end_pk: inclusive primary key to stop migration on
+        :param sleep: seconds to sleep after every batch to throttle load
+        :param retries: attempts to migrate rows changed concurrently,
+            MergeConflictError is raised when they are exhausted
+        :return: generator of last primary key of every migrated batch,
+            persist it to resume interrupted migration
+        """
+        queryset = self.model._base_manager.using(using).order_by('pk')
+        if end_pk is not None:
+            queryset = queryset.filter(pk__lte=end_pk)
+
+        name = self.target.name
+        last_pk = start_pk
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+
+            rows = list(batch.values_list('pk', name)[:batch_size])
+            if not rows:
+                break
+
+            changed = self.write(queryset, rows)
+            for _ in range(retries):
+                if not changed:
+                    break
+
+                changed = self.write(queryset, list(
+                    queryset.filter(pk__in=changed).values_list('pk', name)
+                ))
+
+            if changed:
+                raise MergeConflictError({}, (
+                    'Stored data of {!r} target are changed too often, '
+                    'primary keys: {}'
+                ).format(name, ', '.join(str(pk) for pk in changed)))
+
+            last_pk = rows[-1][0]
+            yield last_pk
+
+            if sleep:
+                time.sleep(sleep)
@@ -0,0 +1,274 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+"""
+Extra target storage keeping every extra field in a row of side table
+with typed value columns, e.g. for wide and sparsely populated targets
+
+    class ExtraValue(AbstractExtraValue):
+        pass
+
+    ExtraTarget('extra', Form, storage=SideTableStorage(ExtraValue))
+"""
+
+from __future__ import unicode_literals, absolute_import
+
+from collections import OrderedDict
+from decimal import Decimal
+
+from django import forms
+from django.core.validators import EMPTY_VALUES
+from django.db import models
+from django.utils.six import iteritems, text_type
+
+from django_model_extra_form.expressions import extra_field_output
+from django_model_extra_form.models import ColumnStorage, RAW, json_module
+
+# value column by internal type of extra_field_output() model field
+VALUE_COLUMNS = {
+    'BooleanField': 'value_boolean',
+    'IntegerField': 'value_integer',
+    'FloatField': 'value_float',
+    'DecimalField': 'value_decimal',
+    'DateField': 'value_date',
+    'DateTimeField': 'value_datetime',
+    'TimeField': 'value_time',
+}
+TEXT_COLUMN = 'value_text'
+# values of other fields (e.g. lists of MultipleChoiceField) as JSON text
+JSON_COLUMN = 'value_json'
+
+
+class AbstractExtraValue(models.Model):
+    """
+    value of one extra field, subclass it in your application
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    target = models.CharField(max_length=100)
+    field = models.CharField(max_length=100)
+    value_text = models.TextField(null=True)
+    value_boolean = models.BooleanField(null=True)
+    value_integer = models.BigIntegerField(null=True)
+    value_float = models.FloatField(null=True)
+    value_decimal = models.DecimalField(
+        max_digits=65, decimal_places=30, null=True
+    )
+    value_date = models.DateField(null=True)
+    value_datetime = models.DateTimeField(null=True)
+    value_time = models.TimeField(null=True)
+    value_json = models.TextField(null=True)
+
+    class Meta(object):
+        abstract = True
+        unique_together = ('model', 'target', 'object_id', 'field')
+
+
+def value_column(form_field):
+    """
+    name of AbstractExtraValue column storing values of form field
+    """
+    if isinstance(form_field, forms.CharField):
+        return TEXT_COLUMN
+
+    output = extra_field_output(form_field)
+    if output is None:
+        return JSON_COLUMN
+
+    return VALUE_COLUMNS.get(output.get_internal_type(), JSON_COLUMN)
+
+
+def decimal_value(form_field, value):
+    """
+    stored decimal with decimal places of form field, database returns
+    it with all decimal places of value column
+    """
+    places = form_field.decimal_places
+    if places is None:
+        places = max(-value.normalize().as_tuple().exponent, 0)
+
+    return value.quantize(Decimal(1).scaleb(-places))
+
+
+def row_value(form_field, row):
+    column = value_column(form_field)
+    value = getattr(row, column)
+    if value is None:
+        return value
+
+    if column == JSON_COLUMN:
+        return json_module().loads(value)
+
+    if column == 'value_decimal':
+        return decimal_value(form_field, value)
+
+    return value
+
+
+def row_values(form_field, value):
+    """
+    :return: values of all value columns, only one of them is set
+    """
+    column = value_column(form_field)
+    if column == JSON_COLUMN:
+        value = json_module().dumps(value)
+
+    values = dict((name, None) for name in VALUE_COLUMNS.values())
+    values.update({TEXT_COLUMN: None, JSON_COLUMN: None, column: value})
+    return values
+
+
+class SideTableStorage(ColumnStorage):
+    """
+    extra fields stored as rows of AbstractExtraValue subclass, only
+    changed fields are written on save, target name isn't model field,
+    versioning, merging and database expressions aren't supported
+    """
+    serializer = RAW
+    has_column = False
+
+    def __init__(self, value_model):
+        self.value_model = value_model
+
+    @staticmethod
+    def stored_name(target):
+        return '_extra_stored_{}'.format(target.name)
+
+    @staticmethod
+    def pending_name(target):
+        return '_extra_pending_{}'.format(target.name)
+
+    @staticmethod
+    def model_label(model):
+        """
+        rows of proxy models are stored under their concrete model
+        """
+        return model._meta.concrete_model._meta.label_lower
+
+    def rows(self, target, model, object_ids):
+        return self.value_model._default_manager.filter(
+            model=self.model_label(model),
+            target=target.name,
+            object_id__in=[text_type(pk) for pk in object_ids],
+        )
+
+    def rows_data(self, target, rows):
+        """
+        :return: {object id: {field name: value}} of loaded rows
+        """
+        fields = target.fields
+        data = {}
+        for row in rows:
+            if row.field in fields:
+                data.setdefault(row.object_id, {})[row.field] = row_value(
+                    fields[row.field], row
+                )
+
+        return data
+
+    def prefetch(self, target, instances):
+        instances = [
+            i for i in instances
+            if i.pk is not None and self.stored_name(target) not in i.__dict__
+        ]
+        if not instances:
+            return
+
+        data = self.rows_data(target, self.rows(
+            target, type(instances[0]), [i.pk for i in instances]
+        ))
+        for instance in instances:
+            instance.__dict__[self.stored_name(target)] = data.get(
+                text_type(instance.pk), {}
+            )
+
+    def stored_data(self, target, instance):
+        if self.stored_name(target) not in instance.__dict__:
+            if instance.pk is None:
+                instance.__dict__[self.stored_name(target)] = {}
+            else:
+                self.prefetch(target, [instance])
+
+        return instance.__dict__[self.stored_name(target)]
+
+    def get_data(self, target, instance):
+        pending = instance.__dict__.get(self.pending_name(target))
+        if pending is not None:
+            return pending
+
+        return self.stored_data(target, instance)
+
+    def set_data(self, target, instance, value):
+        instance.__dict__[self.pending_name(target)] = value
+
+    def save(self, target, instance, using=None):
+        self.save_many(target, [instance], using)
+
+    def save_many(self, target, instances, using=None):
+        """
+        write changed fields of saved instances, missing rows are created
+        at once, existing rows are updated field by field
+        """
+        fields = target.fields
+        manager = self.value_model._default_manager.db_manager(using)
+        # stored rows of all instances are loaded by one query
+        self.prefetch(target, [
+            i for i in instances if self.pending_name(target) in i.__dict__
+        ])
+        created = []
+        for instance in instances:
+            pending = instance.__dict__.pop(self.pending_name(target), None)
+            if pending is None:
+                continue
+
+            if instance.pk is None:
+                raise ValueError(
+                    'Extra data of {!r} target can not be saved without '
+                    'primary key'.format(target.name)
+                )
+
+            stored = self.stored_data(target, instance)
+            # rows are sparse, missing field is cleaned to its empty value
+            changed = OrderedDict(
+                (name, value) for name, value in iteritems(pending)
+                if name in fields and stored.get(name) != value and (
+                    name in stored or value not in EMPTY_VALUES
+                )
+            )
+            rows = self.rows(target, type(instance), [instance.pk]).using(
+                using
+            )
+            empty = [n for n, v in iteritems(changed) if v in EMPTY_VALUES]
+            if empty:
+                rows.filter(field__in=empty).delete()
+
+            for name, value in iteritems(changed):
+                if name in empty:
+                    continue
+
+                if name in stored:
+                    rows.filter(field=name).update(
+                        **row_values(fields[name], value)
+                    )
+                else:
+                    created.append(self.value_model(
+                        model=self.model_label(type(instance)),
+                        target=target.name,
+                        object_id=text_type(instance.pk),
+                        field=name,
+                        **row_values(fields[name], value)
+                    ))
+
+            instance.__dict__[self.stored_name(target)] = dict(
+                (name, value) for name, value in iteritems(pending)
+                if name in fields and value not in EMPTY_VALUES
+            )
+
+        if created:
+            manager.bulk_create(created)
+
+    def delete(self, target, instance, using=None):
+        self.rows(target, type(instance), [instance.pk]).using(
+            using
+        ).delete()
+        instance.__dict__.pop(self.stored_name(target), None)
@@ -7,7 +7,6 @@ from __future__ import unicode_literals, absolute_import
 import codecs
 import os
 import re
-import sys
 from itertools import chain
 
 from setuptools import setup, find_packages
@@ -28,7 +27,8 @@ def find_version(*file_paths):
 
 
 install_requires = [
-    'Django>=1.6',
+    # django.utils.six is removed in Django 3.0
+    'Django>=2.2,<3.0',
     'json-encoder>=0.4.3',
 ]
 
@@ -36,12 +36,11 @@ extra_requires = {
     'rest_framework': [
         'djangorestframework',
     ],
+    'zstd': [
+        'zstandard',
+    ],
 }
 
-if sys.version_info[0:2] < (3, 4):
-    # required for python < 3.4
-    extra_requires['rest_framework'].append('singledispatch>=3.4.0.3')
-
 extra_requires['all'] = list(chain.from_iterable(extra_requires.values()))
 
 setup(
@@ -54,17 +53,22 @@ setup(
     long_description=read('README.rst'),
     setup_requires=['pytest-runner'],
     install_requires=install_requires,
+    # asyncio.run() is used by aio tests
+    python_requires='>=3.7',
     packages=find_packages(exclude=["tests"]),
     include_package_data=True,
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "Environment :: Web Environment",
         "Framework :: Django",
+        "Framework :: Django :: 2.2",
         "Intended Audience :: Developers",
         "Operating System :: OS Independent",
         "Programming Language :: Python",
-        "Programming Language :: Python :: 2.7",
-        "Programming Language :: Python :: 3.5",
+        "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
+        "Programming Language :: Python :: 3.7",
+        "Programming Language :: Python :: 3.8",
     ],
     extras_require=extra_requires,
     tests_require=[
@@ -0,0 +1,59 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
+
+import asyncio
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from django_model_extra_form.aio import aexport_extra_data
+from tests.test_extra_form import ExtraModel
+
+
+@pytest.fixture(params=[None, ThreadPoolExecutor(max_workers=2)])
+def executor(request):
+    return request.param
+
+
+def test_asave():
+    instance = ExtraModel(
+        date=datetime.date(2016, 2, 29),
+        time=datetime.time(1, 2, 3),
+        datetime=datetime.datetime(2016, 2, 29, 1, 2, 3),
+        end_datetime=datetime.datetime(2016, 3, 1, 1, 2, 3),
+    )
+
+    asyncio.run(instance.asave())
+
+    assert instance.step12.startswith('{"date": "2016-02-29"')
+
+
+def test_ahydrate_extra(executor):
+    instance = ExtraModel(step12='{"number": 0.2}')
+
+    asyncio.run(instance.ahydrate_extra(executor))
+
+    assert instance.__dict__['number'] == Decimal('0.2')
+    assert instance.__dict__['date'] is None
+
+
+def test_aexport_extra_data(executor):
+    instances = [
+        ExtraModel(step12='{"number": %d}' % number) for number in range(5)
+    ]
+
+    async def export():
+        return [
+            data async for data in aexport_extra_data(
+                instances, ['number'], chunk_size=2, executor=executor
+            )
+        ]
+
+    data = asyncio.run(export())
+
+    assert data == [{'pk': None, 'number': Decimal(n)} for n in range(5)]
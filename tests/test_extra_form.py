@@ -6,18 +6,37 @@
 from __future__ import unicode_literals, absolute_import
 
 import datetime
+import json
 from decimal import Decimal
+from multiprocessing.pool import ThreadPool
 
 import pytest
 from django import forms
-from django.db import models
+from django.db import NotSupportedError, connection, models
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import utc
-from six import text_type
+from six import StringIO, iteritems, text_type
 
+from django_model_extra_form.batch import deserialize_batch
+from django_model_extra_form.compression import compressed_serializer, \
+    train_dictionary
+from django_model_extra_form.expressions import extra_field_output, ExtraField
 from django_model_extra_form.forms import DateField, TimeField, DateTimeField
 from django_model_extra_form.forms.utils import FormValidationError
 from django_model_extra_form.models import ExtraFormMixin, ExtraForm, \
-    ExtraTarget, RAW
+    ExtraTarget, RAW, hydrate_extra_targets, export_extra_data, \
+    set_extra_annotations, LazyJSON, JSON, merge_extra_data, \
+    MergeConflictError, extra_data_changed, ExtraFormManager, shadow_field, \
+    NOT_LOADED
+from django_model_extra_form.lazyjson import LazyJSONObject
+from django_model_extra_form.management.commands import \
+    train_extra_dictionary
+from django_model_extra_form.storage import AbstractExtraValue, \
+    SideTableStorage, row_values, value_column
+from django_model_extra_form.schema import target_schema, diff_schema, \
+    ExtraMigration, AddField, AlterField, RemoveField, RenameField
 
 
 class FakeModel(models.Model):
@@ -31,6 +50,26 @@ class FakeModel(models.Model):
         return  # stop model saving
 
 
+@pytest.fixture
+def create_tables(transactional_db):
+    """
+    create tables of test models in test database
+    """
+    created = []
+
+    def create(*model_classes):
+        with connection.schema_editor() as editor:
+            for model_class in model_classes:
+                editor.create_model(model_class)
+                created.append(model_class)
+
+    yield create
+
+    with connection.schema_editor() as editor:
+        for model_class in reversed(created):
+            editor.delete_model(model_class)
+
+
 class Step1Form(forms.Form):
     date = DateField()
     time = TimeField()
@@ -256,3 +295,1017 @@ def test_get_data_for_form_default():
     assert data['date'] is None
     assert data['time'] is None
     assert data['datetime'] is None
+
+
+def test_hydrate_extra_targets():
+    # Given
+    instances = [
+        ExtraModel(step12='{"date": "2016-02-29", "number": 0.2}'),
+        ExtraModel(step12='{"date": "2016-03-01"}'),
+    ]
+
+    # When
+    hydrate_extra_targets(instances)
+
+    # Then
+    assert instances[0].__dict__['date'] == datetime.date(2016, 2, 29)
+    assert instances[0].__dict__['number'] == Decimal('0.2')
+    assert instances[1].__dict__['date'] == datetime.date(2016, 3, 1)
+    assert instances[1].__dict__['number'] == Decimal('0.1')
+    assert instances[1].__dict__['string'] == ''
+
+
+def test_deserialize_many():
+    # Given
+    target = ExtraTarget('step12', Step1Form, Step2Form)
+    values = [
+        '{"date": "2016-02-29", "number": 0.2}',
+        '',
+        '{"date": "invalid", "time": "01:02"}',
+    ]
+
+    # When
+    parsed = target.deserialize_many(values, validate=False)
+
+    # Then
+    assert parsed == [target.deserialize(v, validate=False) for v in values]
+
+
+def test_export_extra_data():
+    # Given
+    instance = ExtraModel(step12='{"date": "2016-02-29", "number": 0.2}')
+    instance.string = 'edited'
+
+    # When
+    data = list(export_extra_data([instance], ['number', 'string']))
+
+    # Then
+    assert data == [{'pk': None, 'number': Decimal('0.2'), 'string': 'edited'}]
+
+
+@pytest.mark.parametrize('pool', [ThreadPool(2), None])
+def test_deserialize_batch(pool):
+    # Given
+    target = ExtraTarget('step12', Step2Form)
+    values = ['{"number": %d}' % n for n in range(7)] + [
+        '{"number": "x"}', '{"number":', '{"number": 8}',
+    ]
+
+    # When
+    results = list(deserialize_batch(
+        target, values, processes=2, chunk_size=2, pool=pool
+    ))
+
+    # Then
+    assert results[:7] == [{'number': Decimal(n)} for n in range(7)]
+    assert isinstance(results[7], FormValidationError)
+    assert results[7].message_dict == {'number': ['Enter a number.']}
+    assert isinstance(results[8], FormValidationError)
+    assert list(results[8].message_dict) == ['__all__']
+    assert results[9] == {'number': Decimal(8)}
+
+
+class OldSchemaForm(forms.Form):
+    number = forms.CharField()
+    text = forms.CharField()
+    removed = forms.CharField()
+
+
+class NewSchemaForm(forms.Form):
+    number = forms.DecimalField()
+    string = forms.CharField()
+    added = forms.IntegerField(initial=1)
+
+
+class MigrationModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ExtraTarget('extra', NewSchemaForm),
+    ]
+
+    extra = models.TextField(default='')
+
+    objects = ExtraFormManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+def test_schema_migration():
+    # Given
+    snapshot = target_schema(ExtraTarget('extra', OldSchemaForm))
+
+    # When
+    migration = ExtraMigration.from_snapshot(
+        MigrationModel, 'extra', snapshot, renames={'text': 'string'}
+    )
+    value = migration.migrate_value(
+        '{"number": "0.5", "text": "abc", "removed": "x"}'
+    )
+
+    # Then
+    assert migration.operations == [
+        RenameField('text', 'string'),
+        RemoveField('removed'),
+        AlterField('number'),
+        AddField('added'),
+    ]
+    assert value == '{"number": 0.5, "string": "abc", "added": 1}'
+
+
+class ConcurrentMigration(ExtraMigration):
+    """
+    rows are written by others right after migration reads them
+    """
+    concurrent_writes = 1
+
+    def write(self, queryset, rows):
+        if self.concurrent_writes:
+            self.concurrent_writes -= 1
+            queryset.filter(pk=rows[0][0]).update(
+                extra='{"number": "9", "text": "new"}'
+            )
+
+        return super(ConcurrentMigration, self).write(queryset, rows)
+
+
+def test_schema_migration_run(create_tables):
+    # Given
+    create_tables(MigrationModel)
+    MigrationModel.objects.bulk_create([
+        MigrationModel(pk=pk, extra='{"number": "%d", "text": "t%d"}' % (
+            pk, pk
+        )) for pk in range(1, 6)
+    ])
+    snapshot = target_schema(ExtraTarget('extra', OldSchemaForm))
+    migration = ConcurrentMigration.from_snapshot(
+        MigrationModel, 'extra', snapshot, renames={'text': 'string'}
+    )
+
+    # When
+    last_pks = list(migration.run(batch_size=2, start_pk=1))
+
+    # Then
+    assert last_pks == [3, 5]
+    assert list(MigrationModel.objects.values_list('extra', flat=True)) == [
+        '{"number": "1", "text": "t1"}',
+        '{"number": 9.0, "string": "new", "added": 1}',
+        '{"number": 3.0, "string": "t3", "added": 1}',
+        '{"number": 4.0, "string": "t4", "added": 1}',
+        '{"number": 5.0, "string": "t5", "added": 1}',
+    ]
+
+
+class ArchivedManager(ExtraFormManager):
+
+    def get_queryset(self):
+        return super(ArchivedManager, self).get_queryset().none()
+
+
+class ArchivedMigrationModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ExtraTarget('extra', NewSchemaForm),
+    ]
+
+    extra = models.TextField(default='')
+
+    objects = ArchivedManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+def test_schema_migration_run_filtered_manager(create_tables):
+    # Given: rows hidden by default manager
+    create_tables(ArchivedMigrationModel)
+    ArchivedMigrationModel._base_manager.bulk_create([
+        ArchivedMigrationModel(pk=1, extra='{"number": "1", "text": "t1"}'),
+    ])
+    snapshot = target_schema(ExtraTarget('extra', OldSchemaForm))
+    migration = ExtraMigration.from_snapshot(
+        ArchivedMigrationModel, 'extra', snapshot, renames={'text': 'string'}
+    )
+
+    # When
+    last_pks = list(migration.run())
+
+    # Then
+    assert last_pks == [1]
+    assert list(ArchivedMigrationModel._base_manager.values_list(
+        'extra', flat=True
+    )) == ['{"number": 1.0, "string": "t1", "added": 1}']
+
+
+def upgrade_step2_v0(data):
+    data['number'] = data.pop('amount', None)
+    return data
+
+
+class VersionedModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('step2', Step2Form, version=1, write_back=True,
+                    upgrades={0: upgrade_step2_v0}),
+    ]
+
+    step2 = models.TextField(editable=False)
+
+
+def test_versioned_extra_data_upgrade():
+    instance = VersionedModel(step2='{"amount": 0.5}')
+    assert instance.number == Decimal('0.5')
+
+    instance = VersionedModel(step2='{"number": 0.7, "_version": 1}')
+    assert instance.number == Decimal('0.7')
+
+
+def test_versioned_extra_data_write_back():
+    instance = VersionedModel(step2='{"amount": 0.5}')
+    instance.save()  # fake save by FakeModel
+    assert instance.step2 == '{"number": 0.5, "_version": 1}'
+
+
+class TrustedModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('step12', Step1Form, Step2Form, trusted=True),
+        ExtraTarget('step3', Step3Form, serializer=RAW, trusted=True),
+    ]
+
+    step12 = models.TextField(editable=False)
+    step3 = {}
+
+
+class TypedForm(forms.Form):
+    kind = forms.TypedChoiceField(
+        choices=[(1, 'one'), (2, 'two')], coerce=int, required=False
+    )
+    tags = forms.TypedMultipleChoiceField(
+        choices=[(1, 'one'), (2, 'two')], coerce=int, required=False
+    )
+
+
+class TypedModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('typed', TypedForm),
+    ]
+
+    typed = models.TextField(editable=False)
+
+
+class TrustedTypedModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('typed', TypedForm, trusted=True),
+    ]
+
+    typed = models.TextField(editable=False)
+
+
+@pytest.mark.parametrize('strict_class,trusted_class,data', [
+    (ExtraModel, TrustedModel, {'step12': '', 'step3': {}}),
+    (ExtraModel, TrustedModel, {
+        'step12': '{"date": "2016-02-29", "time": "01:02:03", '
+                  '"datetime": "2016-02-29T01:02:03Z", "number": 0.2}',
+        'step3': {'string': 'testing string',
+                  'end_datetime': datetime.datetime(2016, 3, 1, tzinfo=utc)},
+    }),
+    (ExtraModel, TrustedModel, {
+        'step12': '{"date": "invalid", "time": null, "number": "1.5"}',
+        'step3': {'string': None, 'end_datetime': '2016-03-01 01:02'},
+    }),
+    (TypedModel, TrustedTypedModel, {'typed': '{"kind": 2, "tags": [1]}'}),
+    (TypedModel, TrustedTypedModel, {'typed': '{"kind": "2", "tags": []}'}),
+    (TypedModel, TrustedTypedModel, {'typed': '{"kind": "", "tags": null}'}),
+])
+def test_trusted_extra_data(strict_class, trusted_class, data):
+    # Given
+    strict = strict_class()
+    trusted = trusted_class()
+    for name, value in iteritems(data):
+        setattr(strict, name, value)
+        setattr(trusted, name, value)
+
+    # When
+    strict.hydrate_extra()
+    trusted.hydrate_extra()
+
+    # Then
+    names = [n for t in strict.extra_targets for n in t.field_names]
+    assert [getattr(trusted, n) for n in names] == \
+        [getattr(strict, n) for n in names]
+
+
+def test_set_extra_annotations():
+    # Given
+    instance = ExtraModel(step12='{"date": "2016-02-29", "number": 0.2}')
+    instance._extra_only_number = '0.3'
+    instance._extra_only_string = 'selected'
+
+    # When
+    set_extra_annotations(instance)
+
+    # Then
+    assert '_extra_only_number' not in instance.__dict__
+    assert instance.__dict__['number'] == Decimal('0.3')
+    assert instance.__dict__['string'] == 'selected'
+    assert 'date' not in instance.__dict__
+    assert instance.date == datetime.date(2016, 2, 29)
+
+
+requires_postgresql = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='JSON expressions require PostgreSQL database',
+)
+
+
+class QueryModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ['step12', Step1Form, Step2Form],
+    ]
+
+    step12 = models.TextField(default='')
+
+    objects = ExtraFormManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+@pytest.fixture
+def query_rows(create_tables):
+    create_tables(QueryModel)
+    QueryModel.objects.bulk_create([
+        QueryModel(pk=1, step12='{"date": "2016-02-29", "number": 0.5}'),
+        QueryModel(pk=2, step12='{"date": "2016-02-29", "number": "1.5"}'),
+        QueryModel(pk=3, step12=''),
+    ])
+
+
+@requires_postgresql
+def test_only_extra(query_rows):
+    # When
+    instances = list(
+        QueryModel.objects.only_extra('number', 'date').order_by('pk')
+    )
+
+    # Then
+    assert [(i.number, i.date) for i in instances] == [
+        (Decimal('0.5'), datetime.date(2016, 2, 29)),
+        (Decimal('1.5'), datetime.date(2016, 2, 29)),
+        (Decimal('0.1'), None),
+    ]
+    assert all('step12' in i.get_deferred_fields() for i in instances)
+    with pytest.raises(ValueError):
+        QueryModel.objects.only_extra('unknown')
+
+
+@requires_postgresql
+def test_extra_field_expressions(query_rows):
+    # When
+    grouped = QueryModel.objects.annotate_extra('date').values(
+        'date'
+    ).annotate(count=Count('pk')).order_by('date')
+    total = QueryModel.objects.aggregate(
+        total=Sum(ExtraField('number')) + 1
+    )
+
+    # Then
+    assert list(grouped) == [
+        {'date': datetime.date(2016, 2, 29), 'count': 2},
+        {'date': None, 'count': 1},
+    ]
+    assert total == {'total': Decimal('3')}
+    with pytest.raises(ValueError):
+        QueryModel.objects.annotate(x=ExtraField('unknown')).count()
+
+
+@pytest.mark.skipif(
+    connection.vendor == 'postgresql', reason='PostgreSQL is supported'
+)
+def test_extra_expressions_not_supported():
+    with pytest.raises(NotSupportedError):
+        QueryModel.objects.only_extra('number')
+
+    with pytest.raises(NotSupportedError):
+        QueryModel.objects.annotate_extra('date')
+
+    with pytest.raises(NotSupportedError):
+        str(QueryModel.objects.annotate(x=ExtraField('number')).query)
+
+
+@pytest.mark.parametrize('form_field,model_field_class', [
+    (forms.CharField(), type(None)),
+    (forms.BooleanField(), models.BooleanField),
+    (forms.IntegerField(), models.IntegerField),
+    (forms.FloatField(), models.FloatField),
+    (Step2Form.base_fields['number'], models.DecimalField),
+    (DateField(), models.DateField),
+    (DateTimeField(), models.DateTimeField),
+    (TimeField(), models.TimeField),
+])
+def test_extra_field_output(form_field, model_field_class):
+    output_field = extra_field_output(form_field)
+    assert type(output_field) is model_field_class
+    if isinstance(output_field, models.DecimalField):
+        assert output_field.max_digits == 6
+        assert output_field.decimal_places == 2
+
+
+class ShadowModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('step12', Step1Form, Step2Form,
+                    shadow_fields=('date', 'number')),
+    ]
+
+    step12 = models.TextField(editable=False)
+
+
+def test_shadow_fields():
+    # Given
+    number_field = ShadowModel._meta.get_field('number')
+    date = datetime.date(2016, 2, 29)
+
+    # When
+    instance = ShadowModel(
+        date=date, time=datetime.time(1, 2, 3), number=Decimal('0.2'),
+        datetime=datetime.datetime(2016, 2, 29, 1, 2, 3, tzinfo=utc),
+    )
+    instance.save()  # fake save by FakeModel
+
+    # Then
+    assert isinstance(ShadowModel._meta.get_field('date'), models.DateField)
+    assert isinstance(number_field, models.DecimalField)
+    assert number_field.decimal_places == 2
+    assert number_field.null and number_field.db_index
+    assert instance.number == Decimal('0.2')
+    assert instance.step12.startswith('{"date": "2016-02-29"')
+    assert instance.step12.endswith('"number": 0.2}')
+
+
+def test_lazy_json_object():
+    raw = ' { "a" : [1, {"b": "]}\\"\\u0041"}], "c":null ,"d": -1.5e3,' \
+          '"e": {"f": []}, "g": "x"}'
+
+    data = LazyJSONObject(raw)
+
+    assert list(data) == ['a', 'c', 'd', 'e', 'g']
+    assert data._values == {}
+    assert data['d'] == -1.5e3
+    assert list(data._values) == ['d']
+    assert dict(data) == {
+        'a': [1, {'b': ']}"A'}], 'c': None, 'd': -1.5e3, 'e': {'f': []},
+        'g': 'x',
+    }
+    assert dict(LazyJSONObject(b'{}')) == {}
+    assert dict(LazyJSONObject('')) == {}
+
+
+class LazyModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('step12', Step1Form, Step2Form, serializer=LazyJSON,
+                    trusted=True),
+    ]
+
+    step12 = models.TextField(editable=False)
+
+
+def test_lazy_extra_data():
+    # Given
+    instance = LazyModel(
+        step12='{"date": "2016-02-29", "time": "01:02:03", "number": 0.2}'
+    )
+
+    # When
+    number = instance.number
+
+    # Then
+    assert number == Decimal('0.2')
+    assert 'date' not in instance.__dict__
+    assert list(instance._extra_lazy_step12[1]._values) == ['number']
+    assert instance.date == datetime.date(2016, 2, 29)
+    assert instance.datetime is None
+
+
+def test_set_extra_data_at_once():
+    # Given
+    instance = ExtraModel(step12='{"number": 0.2}')
+    instance.step3 = {'string': 'stored'}
+
+    # When
+    instance.set_extra_data({'number': Decimal('0.3'), 'other': 1})
+
+    # Then
+    assert instance._extra_dirty == {'step12'}
+    assert instance.__dict__['number'] == Decimal('0.3')
+    assert instance.other == 1
+    assert instance.get_extra_data(['number', 'date', 'string']) == {
+        'number': Decimal('0.3'), 'date': None, 'string': 'stored',
+    }
+
+
+def test_compressed_serializer():
+    # Given
+    samples = [
+        ('{"date": "2016-02-%02d", "number": %d, "string": "repeated"}'
+         % (day, day)).encode('utf-8')
+        for day in range(1, 29)
+    ]
+    dictionary = train_dictionary(samples, size=256)
+    serializer = compressed_serializer(JSON, dictionary=dictionary)
+    plain_serializer = compressed_serializer(JSON, level=9)
+    data = {'date': '2016-02-29', 'number': 29, 'string': 'repeated'}
+
+    # When
+    compressed = serializer.dumps(data)
+    plain = plain_serializer.dumps(data)
+
+    # Then
+    assert dictionary and len(dictionary) <= 256
+    assert compressed.startswith(b'\x00z')
+    assert len(compressed) < len(plain)
+    assert serializer.loads(compressed) == data
+    assert serializer.loads(memoryview(compressed)) == data
+    assert plain_serializer.loads(plain) == data
+    # legacy uncompressed data
+    assert serializer.loads(samples[0]) == json.loads(samples[0].decode())
+    assert serializer.loads('{"number": 1}') == {'number': 1}
+    with pytest.raises(ValueError):
+        plain_serializer.loads(compressed)
+    with pytest.raises(ValueError):
+        plain_serializer.loads(b'\x00x' + compressed[2:])
+    with pytest.raises(ValueError):
+        compressed_serializer(RAW)
+
+
+def test_train_extra_dictionary(create_tables, monkeypatch, tmpdir):
+    # Given
+    create_tables(MigrationModel)
+    MigrationModel.objects.bulk_create([
+        MigrationModel(pk=pk, extra='{"number": %d, "string": "row"}' % pk)
+        for pk in range(1, 301)
+    ])
+    monkeypatch.setattr(
+        train_extra_dictionary.apps, 'get_model', lambda label: MigrationModel
+    )
+    command = train_extra_dictionary.Command()
+    target = MigrationModel.get_extra_targets()[0]
+    output = tmpdir.join('dictionary')
+    stdout = StringIO()
+
+    # When
+    sampled = command.get_samples(MigrationModel, target, 100)
+    small = command.get_samples(MigrationModel, target, 1000)
+    call_command(command, 'test.MigrationModel', 'extra', str(output),
+                 sample=10, holdout=0.3, stdout=stdout)
+
+    # Then: random runs of rows, whole table when it's small
+    assert 0 < len(sampled) <= 100
+    assert len(set(sampled)) == len(sampled)
+    assert len(small) == 300
+    assert output.read_binary()
+    assert 'trained from 7 rows' in stdout.getvalue()
+    assert 'measured on 3 other rows' in stdout.getvalue()
+
+
+def test_changed_data():
+    # Given
+    instance = ExtraModel(step12='{"number": 0.2, "date": "2016-02-29"}')
+    instance.hydrate_extra()
+
+    # When
+    instance.number = Decimal('0.20')
+    instance.date = datetime.date(2016, 3, 1)
+
+    # Then
+    target = instance.extra_targets[0]
+    assert target.changed_data(instance) == {
+        'date': datetime.date(2016, 3, 1),
+    }
+
+
+def test_extra_data_changed_signal():
+    # Given
+    deltas = []
+
+    def receiver(sender, instance, delta, **kwargs):
+        deltas.append(delta)
+
+    instance = ExtraModel(
+        step12='{"date": "2016-02-29", "time": "01:02:03", '
+               '"datetime": "2016-02-29T01:02:03Z", "number": 0.2}'
+    )
+    instance.step3 = {'string': '', 'end_datetime': '2016-03-01T00:00:00Z'}
+    instance.hydrate_extra()
+
+    # When
+    extra_data_changed.connect(receiver, sender=ExtraModel)
+    try:
+        instance.number = Decimal('0.20')
+        instance.date = datetime.date(2016, 3, 1)
+        instance.string = 'changed'
+        instance.save()  # fake save by FakeModel
+        instance.save()
+    finally:
+        extra_data_changed.disconnect(receiver, sender=ExtraModel)
+
+    # Then
+    assert deltas == [{
+        'step12': {'date': (datetime.date(2016, 2, 29),
+                            datetime.date(2016, 3, 1))},
+        'step3': {'string': ('', 'changed')},
+    }]
+
+
+class MergeForm(forms.Form):
+    string = forms.CharField(required=False)
+    number = forms.IntegerField(required=False)
+
+
+class OptimisticModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ExtraTarget('extra', MergeForm, optimistic=True),
+    ]
+
+    extra = models.TextField(default='')
+    other = models.IntegerField(default=0)
+
+    objects = ExtraFormManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+def test_optimistic_merge(create_tables):
+    # Given
+    create_tables(OptimisticModel)
+    pk = OptimisticModel.objects.create(string='a', number=1).pk
+    first, second = [OptimisticModel.objects.get(pk=pk) for _ in range(2)]
+    first.hydrate_extra()
+    second.hydrate_extra()
+
+    # When
+    first.string = 'b'
+    first.save()
+    second.number = 2
+    second.save()
+
+    # Then
+    stored = OptimisticModel.objects.get(pk=pk)
+    assert (stored.string, stored.number) == ('b', 2)
+    assert (second.string, second.number) == ('b', 2)
+
+    first.number = 3
+    with pytest.raises(MergeConflictError) as exc_info:
+        first.save()
+
+    assert exc_info.value.conflicts == {'number': (1, 2, 3)}
+
+
+def test_optimistic_merge_deferred_fields(create_tables):
+    # Given
+    create_tables(OptimisticModel)
+    pk = OptimisticModel.objects.create(string='a').pk
+    instance = OptimisticModel.objects.only('extra').get(pk=pk)
+    OptimisticModel.objects.filter(pk=pk).update(other=5)
+
+    # When
+    instance.string = 'b'
+    with CaptureQueriesContext(connection) as queries:
+        instance.save()
+
+    # Then
+    assert not any('other' in q['sql'] for q in queries.captured_queries)
+    stored = OptimisticModel.objects.get(pk=pk)
+    assert (stored.string, stored.other) == ('b', 5)
+
+
+def test_optimistic_merge_update_fields(create_tables):
+    # Given
+    create_tables(OptimisticModel)
+    pk = OptimisticModel.objects.create(string='a').pk
+    instance = OptimisticModel.objects.get(pk=pk)
+
+    # When: target isn't in update_fields
+    instance.string = 'b'
+    instance.other = 1
+    instance.save(update_fields=['other'])
+
+    # Then: only other is written, target stays changed
+    stored = OptimisticModel.objects.get(pk=pk)
+    assert (stored.string, stored.other) == ('a', 1)
+    instance.save(update_fields=['extra'])
+    assert OptimisticModel.objects.get(pk=pk).string == 'b'
+
+
+class ActiveManager(ExtraFormManager):
+
+    def get_queryset(self):
+        return super(ActiveManager, self).get_queryset().filter(other=0)
+
+
+class ActiveOptimisticModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ExtraTarget('extra', MergeForm, optimistic=True),
+    ]
+
+    extra = models.TextField(default='')
+    other = models.IntegerField(default=0)
+
+    objects = ActiveManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+def test_optimistic_merge_filtered_manager(create_tables):
+    # Given: row hidden by default manager
+    create_tables(ActiveOptimisticModel)
+    instance = ActiveOptimisticModel.objects.create(string='a', other=1)
+
+    # When
+    instance.string = 'b'
+    instance.save()
+
+    # Then
+    stored = ActiveOptimisticModel._base_manager.get(pk=instance.pk)
+    assert stored.string == 'b'
+
+
+class ShadowForm(forms.Form):
+    string = forms.CharField(max_length=10, required=False)
+    number = forms.IntegerField(required=False)
+
+
+class ShadowDbModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ExtraTarget('extra', ShadowForm, shadow_fields=('string', )),
+    ]
+
+    extra = models.TextField(default='')
+
+    objects = ExtraFormManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+def test_extra_data_changed_shadow_fields(create_tables):
+    # Given
+    create_tables(ShadowDbModel)
+    deltas = []
+
+    def receiver(sender, instance, delta, **kwargs):
+        deltas.append(delta)
+
+    pk = ShadowDbModel.objects.create(string='x', number=1).pk
+
+    # When
+    extra_data_changed.connect(receiver, sender=ShadowDbModel)
+    try:
+        instance = ShadowDbModel.objects.get(pk=pk)
+        instance.save()
+        instance.hydrate_extra()
+        instance.number = 2
+        instance.save()
+        instance.string = 'y'
+        instance.save()
+        ShadowDbModel.objects.create(string='z', number=3)
+    finally:
+        extra_data_changed.disconnect(receiver, sender=ShadowDbModel)
+
+    # Then
+    assert deltas == [
+        {'extra': {'number': (1, 2)}},
+        {'extra': {'string': ('x', 'y')}},
+        {'extra': {'string': (NOT_LOADED, 'z'), 'number': (NOT_LOADED, 3)}},
+    ]
+
+
+class ShadowProxyModel(ShadowDbModel):
+
+    class Meta(object):
+        app_label = 'test'
+        proxy = True
+
+
+class ShadowChildModel(ShadowDbModel):
+
+    class Meta(object):
+        app_label = 'test'
+
+
+def test_shadow_fields_inherited():
+    child_fields = [
+        f.name for f in ShadowChildModel._meta.get_fields()
+        if f.name == 'string'
+    ]
+
+    # shadow fields aren't added again
+    assert not [
+        e for model in (ShadowProxyModel, ShadowChildModel)
+        for e in model.check() if e.id in ('models.E006', 'models.E017')
+    ]
+    assert child_fields == ['string']
+    assert ShadowChildModel._meta.get_field('string').model is ShadowDbModel
+
+
+def test_shadow_fields_not_synced(create_tables):
+    # Given
+    create_tables(ShadowDbModel)
+    pk = ShadowDbModel.objects.create(string='x', number=1).pk
+    # column added to existing table
+    ShadowDbModel.objects.filter(pk=pk).update(string=None)
+
+    # When
+    ShadowDbModel.objects.get(pk=pk).save()
+
+    # Then
+    assert ShadowDbModel.objects.values_list('extra', flat=True).get() == \
+        '{"string": "x", "number": 1}'
+    ShadowDbModel.objects.sync_shadow_fields()
+    assert ShadowDbModel.objects.get(pk=pk).string == 'x'
+
+
+def test_shadow_field_requires_max_length():
+    with pytest.raises(ValueError):
+        shadow_field(forms.CharField())
+
+
+def test_merge_extra_data():
+    loaded = {'number': 1, 'string': 'a', 'date': None}
+    stored = {'number': 2, 'string': 'a', 'date': None}
+
+    merged = merge_extra_data(stored, loaded, {'string': 'b'})
+    assert merged == {'number': 2, 'string': 'b', 'date': None}
+
+    # same change made by both is fine
+    merged = merge_extra_data(stored, loaded, {'number': 2})
+    assert merged == stored
+
+    with pytest.raises(MergeConflictError) as exc_info:
+        merge_extra_data(stored, loaded, {'number': 3, 'string': 'b'})
+
+    assert exc_info.value.conflicts == {'number': (1, 2, 3)}
+
+
+class ExtraValue(AbstractExtraValue):
+
+    class Meta(object):
+        app_label = 'test'
+
+
+class SideTableModel(ExtraFormMixin, FakeModel):
+
+    extra_targets = [
+        ExtraTarget('step12', Step1Form, Step2Form,
+                    storage=SideTableStorage(ExtraValue)),
+    ]
+
+
+class SideModel(ExtraFormMixin, models.Model):
+
+    extra_targets = [
+        ExtraTarget('step2', Step2Form, storage=SideTableStorage(ExtraValue)),
+    ]
+
+    objects = ExtraFormManager()
+
+    class Meta(object):
+        app_label = 'test'
+
+
+class SideProxyModel(SideModel):
+
+    class Meta(object):
+        app_label = 'test'
+        proxy = True
+
+
+def test_side_table_storage_round_trip(create_tables):
+    # Given
+    create_tables(SideModel, ExtraValue)
+    instance = SideModel.objects.create(number=Decimal('3'))
+
+    # When
+    loaded = SideModel.objects.prefetch_extra().get(pk=instance.pk)
+    with CaptureQueriesContext(connection) as queries:
+        loaded.save()
+    proxy = SideProxyModel.objects.get(pk=instance.pk)
+    proxy.number = Decimal('4.5')
+    proxy.save()
+
+    # Then
+    assert loaded.number == Decimal('3.00')
+    assert not any('extravalue' in q['sql'] for q in queries.captured_queries)
+    assert SideModel.objects.get(pk=instance.pk).number == Decimal('4.50')
+    assert list(ExtraValue.objects.values_list('model', 'value_decimal')) \
+        == [('test.sidemodel', Decimal('4.5'))]
+
+    proxy.delete()
+    assert not ExtraValue.objects.exists()
+
+
+def test_side_table_storage_bulk_create(create_tables):
+    create_tables(SideModel, ExtraValue)
+
+    SideModel.objects.bulk_create([
+        SideModel(pk=pk, number=Decimal(pk)) for pk in (1, 2)
+    ])
+
+    assert [o.number for o in SideModel.objects.order_by('pk')] == \
+        [Decimal('1.00'), Decimal('2.00')]
+    with pytest.raises(ValueError):
+        # sqlite doesn't return primary keys of created rows
+        SideModel.objects.bulk_create([SideModel(number=Decimal(3))])
+
+    assert SideModel.objects.count() == 2
+
+
+def extra_value_selects(queries):
+    return [
+        q for q in queries.captured_queries
+        if q['sql'].startswith('SELECT') and 'extravalue' in q['sql']
+    ]
+
+
+def test_side_table_storage_bulk_update(create_tables):
+    # Given
+    create_tables(SideModel, ExtraValue)
+    SideModel.objects.bulk_create([
+        SideModel(pk=pk, number=Decimal(pk)) for pk in (1, 2, 3)
+    ])
+    target = SideModel.get_extra_targets()[0]
+    objs = list(SideModel.objects.order_by('pk'))
+    for obj in objs:
+        obj.number = Decimal(obj.pk + 1)
+
+    # When
+    with CaptureQueriesContext(connection) as bulk_queries:
+        SideModel.objects.bulk_update_extra(objs)
+    objs = list(SideModel.objects.order_by('pk'))
+    for obj in objs:
+        target.set_data(obj, {'number': Decimal(obj.pk + 2)})
+    with CaptureQueriesContext(connection) as save_queries:
+        target.storage.save_many(target, objs)
+
+    # Then: stored rows are loaded by one query
+    assert len(extra_value_selects(bulk_queries)) == 1
+    assert len(extra_value_selects(save_queries)) == 1
+    assert [o.number for o in SideModel.objects.order_by('pk')] == \
+        [Decimal('3.00'), Decimal('4.00'), Decimal('5.00')]
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'optimistic': True},
+    {'version': 1},
+])
+def test_side_table_storage_unsupported(kwargs):
+    with pytest.raises(ValueError):
+        ExtraTarget('step2', Step2Form, storage=SideTableStorage(ExtraValue),
+                    **kwargs)
+
+
+def test_side_table_storage():
+    # Given
+    target = SideTableModel.get_extra_targets()[0]
+    storage = target.storage
+    date = datetime.date(2016, 2, 29)
+    rows = [
+        ExtraValue(object_id='1', field='date',
+                   **row_values(target.fields['date'], date)),
+        ExtraValue(object_id='1', field='number',
+                   **row_values(target.fields['number'], Decimal('0.2'))),
+        ExtraValue(object_id='1', field='removed', value_text='x'),
+    ]
+
+    # When
+    instance = SideTableModel(pk=1)
+    instance.__dict__[storage.stored_name(target)] = storage.rows_data(
+        target, rows
+    )['1']
+    assert instance.time is None
+    instance.time = datetime.time(1, 2, 3)
+    instance.datetime = datetime.datetime(2016, 2, 29, 1, 2, 3, tzinfo=utc)
+    instance.number = Decimal('0.3')
+    instance.serialize_extra()
+
+    # Then
+    assert target.serializer is RAW
+    assert value_column(target.fields['date']) == 'value_date'
+    assert value_column(forms.CharField()) == 'value_text'
+    assert value_column(forms.MultipleChoiceField()) == 'value_json'
+    assert rows[0].value_date == date and rows[0].value_text is None
+    assert instance.date == date
+    assert target.get_data(instance)['number'] == Decimal('0.3')
+    assert instance.__dict__[storage.stored_name(target)] == {
+        'date': date, 'number': Decimal('0.2'),
+    }
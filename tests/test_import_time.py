@@ -0,0 +1,48 @@
+#!//usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2016 NZME
+
+from __future__ import unicode_literals, absolute_import
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_CODE = """
+import django
+django.setup()
+import django_model_extra_form.models
+import django_model_extra_form.contrib.rest_framework.serializers
+"""
+
+
+def imported_modules():
+    """
+    import package in clean interpreter
+    :return: set of imported module names
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='tests.test_settings')
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', IMPORT_CODE],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    _, stderr = process.communicate()
+    assert process.returncode == 0, stderr
+    return set(
+        line.rsplit('|', 1)[1].strip() for line in stderr.splitlines()
+        if line.startswith('import time:') and '|' in line
+    )
+
+
+def test_lazy_imports():
+    modules = imported_modules()
+
+    # optional dependencies are imported on first use
+    assert 'django_model_extra_form.models' in modules
+    assert 'json_encoder' not in modules
+    assert 'django_model_extra_form.lazyjson' not in modules
+    assert 'django_model_extra_form.expressions' not in modules
+    assert 'django_model_extra_form.aio' not in modules
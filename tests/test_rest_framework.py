@@ -5,6 +5,7 @@
 from __future__ import unicode_literals, absolute_import
 
 import datetime
+import json
 from decimal import Decimal
 
 import pytest
@@ -12,10 +13,21 @@ from django import forms
 from django.utils.timezone import utc
 from django_model_extra_form.contrib.rest_framework.field_mapping import \
     map_form_to_serializer
-from django_model_extra_form.contrib.rest_framework.fields import FormField
+from django_model_extra_form.contrib.rest_framework.fields import FormField, \
+    RawExtraTargetField, RawJSON
+from django_model_extra_form.contrib.rest_framework.renderers import \
+    StreamingJSONRenderer, StreamingNDJSONRenderer, ExtraJSONRenderer
 from django_model_extra_form.contrib.rest_framework.serializers import \
-    ExtraFormSerializerMixin, extra_form_fields_names
-from rest_framework.serializers import ModelSerializer
+    ExtraFormSerializerMixin, extra_form_fields_names, \
+    extra_form_serializer_class, ExtraFormListSerializer
+from django_model_extra_form.contrib.rest_framework import \
+    serializers as extra_serializers
+from django_model_extra_form.contrib.rest_framework.views import \
+    stream_representation
+from django_model_extra_form.models import hydrate_extra_targets
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ModelSerializer, ListSerializer
 from tests.test_extra_form import ExtraModel
 
 
@@ -39,6 +51,15 @@ def test_field_serialization(serializer_field):
     assert value == '"test value"'
 
 
+def test_map_form_to_serializer_singledispatch_api():
+    func = map_form_to_serializer.dispatch(forms.EmailField)
+
+    assert func(forms.EmailField())[0] is serializers.EmailField
+    assert map_form_to_serializer.registry[forms.CharField] is \
+        map_form_to_serializer.dispatch(forms.CharField)
+    assert forms.DateField in map_form_to_serializer.registry
+
+
 def to_internal_value(serializer_field):
     value = serializer_field.to_internal_value('test value')
     assert value == ['ok', 'test value']
@@ -103,3 +124,158 @@ def test_deserialize_extra_data(data, validated_data):
     assert serializer.is_valid(), serializer.errors
     data = serializer.validated_data
     assert data == validated_data
+
+
+def test_extra_form_serializer_class(extra_model_instance):
+    serializer_class = extra_form_serializer_class(ExtraModel)
+    assert serializer_class is extra_form_serializer_class(ExtraModel)
+
+    serializer = serializer_class(instance=extra_model_instance)
+    assert serializer.data == ExtraSerializer(extra_model_instance).data
+
+
+def test_extra_form_list_serializer(monkeypatch):
+    instances = [
+        ExtraModel(step12='{"number": %d, "date": "2016-02-29"}' % n)
+        for n in range(3)
+    ]
+    serializer_class = extra_form_serializer_class(ExtraModel)
+    hydrated = []
+
+    def hydrate(instances):
+        hydrated.append(len(instances))
+        return hydrate_extra_targets(instances)
+
+    monkeypatch.setattr(
+        extra_serializers, 'hydrate_extra_targets', hydrate
+    )
+
+    serializer = serializer_class(instances, many=True)
+
+    assert isinstance(serializer, ExtraFormListSerializer)
+    assert [row['number'] for row in serializer.data] == \
+        ['0.00', '1.00', '2.00']
+    assert all(row['date'] == '2016-02-29' for row in serializer.data)
+    # page is hydrated once, rows aren't hydrated again
+    assert hydrated == [3]
+
+
+class CustomListSerializer(ListSerializer):
+    pass
+
+
+class CustomListExtraSerializer(ExtraSerializer):
+
+    class Meta(ExtraSerializer.Meta):
+        list_serializer_class = CustomListSerializer
+
+
+def test_extra_form_serializer_many_init():
+    # Given
+    instances = [ExtraModel(step12='{"number": 0.5}')]
+
+    # When
+    serializer = ExtraSerializer(instances, many=True, allow_empty=False)
+    custom = CustomListExtraSerializer(instances, many=True)
+
+    # Then
+    assert type(serializer) is ExtraFormListSerializer
+    assert not serializer.allow_empty
+    assert isinstance(serializer.child, ExtraSerializer)
+    assert serializer.data[0]['number'] == '0.50'
+    assert type(custom) is CustomListSerializer
+
+
+class RawExtraSerializer(ExtraFormSerializerMixin, ModelSerializer):
+
+    step12 = RawExtraTargetField()
+
+    class Meta(object):
+        model = ExtraModel
+        fields = ('step12', 'string')
+
+
+@pytest.mark.parametrize('renderer,expected,empty', [
+    (StreamingJSONRenderer(),
+     b'[{"step12":{"number": 0},"string":""},'
+     b'{"step12":{"number": 1},"string":""}]', b'[]'),
+    (StreamingNDJSONRenderer(),
+     b'{"step12":{"number": 0},"string":""}\n'
+     b'{"step12":{"number": 1},"string":""}\n', b''),
+])
+def test_stream_representation(renderer, expected, empty):
+    instances = [ExtraModel(step12='{"number": %d}' % n) for n in range(2)]
+    serializer = RawExtraSerializer(many=True)
+
+    rows = stream_representation(instances, serializer, chunk_size=1)
+
+    assert b''.join(renderer.render_stream(rows)) == expected
+    assert b''.join(renderer.render_stream([])) == empty
+
+
+def test_extra_json_renderer():
+    instance = ExtraModel(step12='{"number": 0.5, "date": null}')
+    data = RawExtraSerializer(instance, context={'raw_json': True}).data
+
+    assert ExtraJSONRenderer().render(data) == \
+        b'{"step12":{"number": 0.5, "date": null},"string":""}'
+    assert ExtraJSONRenderer().render(
+        data, 'application/json; indent=2'
+    ) == json.dumps(
+        {'step12': {'number': 0.5, 'date': None}, 'string': ''}, indent=2
+    ).encode()
+
+
+def test_extra_json_renderer_nested_raw_json():
+    # Given
+    data = {
+        'rows': [{'extra': RawJSON('{"a": [1]}'), 'id': 1}, {'id': 2}],
+        'text': '"quoted" \u2028',
+        1: Decimal('0.5'),
+    }
+
+    # When
+    rendered = ExtraJSONRenderer().render(data)
+
+    # Then
+    assert rendered == (
+        b'{"rows":[{"extra":{"a": [1]},"id":1},{"id":2}],'
+        b'"text":"\\"quoted\\" \\u2028","1":0.5}'
+    )
+    assert isinstance(data['rows'][0]['extra'], RawJSON)
+
+
+def test_raw_extra_target_field_renderer(rf):
+    request = rf.get('/')
+    instance = ExtraModel(step12='{"number": 0.5}')
+
+    request.accepted_renderer = ExtraJSONRenderer()
+    raw = RawExtraSerializer(instance, context={'request': request}).data
+    request.accepted_renderer = JSONRenderer()
+    decoded = RawExtraSerializer(instance, context={'request': request}).data
+
+    assert isinstance(raw['step12'], RawJSON)
+    assert not isinstance(decoded['step12'], RawJSON)
+    assert decoded['step12']['number'] == Decimal('0.5')
+
+
+def test_raw_extra_target_field_decodes_by_default():
+    # Given: serializer without request or raw_json flag in context
+    instance = ExtraModel(step12='{"number": 0.5}')
+
+    # When: serializing instance
+    data = RawExtraSerializer(instance).data
+
+    # Then: stored JSON is decoded, not passed through
+    assert not isinstance(data['step12'], RawJSON)
+    assert data['step12']['number'] == Decimal('0.5')
+    assert b'"number":0.5' in JSONRenderer().render(data)
+
+
+def test_raw_extra_target_field_debug_check(settings, caplog):
+    settings.DEBUG = True
+    instance = ExtraModel(step12='{"number": 0.5, "unknown": 1}')
+
+    RawExtraSerializer(instance, context={'raw_json': True}).data
+
+    assert 'differ from cleaned data' in caplog.text
@@ -4,6 +4,25 @@
 
 from __future__ import unicode_literals, absolute_import
 
+import os
+
 SECRET_KEY = 'test-key'
 
 USE_TZ = True
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+if os.environ.get('POSTGRES_DB'):
+    # JSON expressions are tested on PostgreSQL only
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['POSTGRES_DB'],
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+    }